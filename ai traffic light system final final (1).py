@@ -1,9 +1,46 @@
 
 import random  
 import time    
-import tkinter as tk  
-from tkinter import ttk  
 import threading  
+import argparse
+import array
+import asyncio
+import concurrent.futures
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import platform
+import queue
+import signal
+import sqlite3
+import struct
+import sys
+import tracemalloc
+from collections import OrderedDict, deque
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# tkinter is only imported when a GUI is started, so the module also
+# works on headless machines
+tk = None
+
+
+def load_tkinter():
+    global tk
+    if tk is None:
+        import tkinter
+        tk = tkinter
+    return tk
 
 
 def cost(state):
@@ -42,13 +79,31 @@ def transition_for_planning(state, action, min_green_time=3):
     
     return (n, s, e, w, new_phase, new_tp)
 
-def transition_for_simulation(state, action, min_green_time=3):
+# N/S and E/W lanes always move together and cost/heuristic only look at
+# sums and maxima, so swapping within a pair never changes a decision
+FOLD_SYMMETRIC_LANES = True
+
+
+def canonical_state(state, min_green_time=3):
+    n, s, e, w, phase, tp = state
+    if tp > min_green_time:
+        tp = min_green_time
+    if FOLD_SYMMETRIC_LANES:
+        if n > s:
+            n, s = s, n
+        if e > w:
+            e, w = w, e
+    return (n, s, e, w, phase, tp)
+
+def transition_for_simulation(state, action, min_green_time=3, rng=random,
+                              arrival_range=(0, 2), departure_range=(1, 3)):
     n, s, e, w, phase, tp = state
+    low, high = arrival_range
     
-    n = n + random.randint(0, 2)
-    s = s + random.randint(0, 2)
-    e = e + random.randint(0, 2)
-    w = w + random.randint(0, 2)
+    n = n + rng.randint(low, high)
+    s = s + rng.randint(low, high)
+    e = e + rng.randint(low, high)
+    w = w + rng.randint(low, high)
     
     if action == "HOLD":
         new_phase = phase
@@ -61,378 +116,2093 @@ def transition_for_simulation(state, action, min_green_time=3):
             new_phase = phase
             new_tp = tp + 1
     
+    low, high = departure_range
     if new_phase == "NS":
-        n = max(0, n - random.randint(1, 3))
-        s = max(0, s - random.randint(1, 3))
+        n = max(0, n - rng.randint(low, high))
+        s = max(0, s - rng.randint(low, high))
     else:  
-        e = max(0, e - random.randint(1, 3))
-        w = max(0, w - random.randint(1, 3))
+        e = max(0, e - rng.randint(low, high))
+        w = max(0, w - rng.randint(low, high))
     
     return (n, s, e, w, new_phase, new_tp)
 
 
-def bfs(start_state, horizon):
-    visited = []
-    queue = [[(start_state, None)]]  
-    best_action = "HOLD"
-    best_cost = float('inf')
+# ==================== PACKED STATES ====================
+
+# A packed state is one int. Each lane pair is stored sorted, low lane
+# first, with a bit recording whether the raw order was swapped:
+#   bits  0-11 min(n, s)    bits 24-35 min(e, w)    bit 48 phase (1 = EW)
+#   bits 12-23 max(n, s)    bits 36-47 max(e, w)    bit 49 n > s, bit 50 e > w
+#   bits 51+   time_in_phase, capped at PACKED_TP_CAP
+# Both lanes of a pair always move together, so the sorted order survives
+# every transition, folding symmetric lanes is just masking out the two
+# swap bits, and the heuristic only compares the two high lanes. The
+# value stays below 2**60, two CPython digits. Encoding leaves
+# PACKED_HEADROOM spare cars per lane because every planning step adds one
+# car to each lane.
+PACKED_LANE_MASK = 4095
+PACKED_TP_SHIFT = 51
+PACKED_TP_CAP = 511
+PACKED_HEADROOM = 256
+
+
+def encode_state(state):
+    n, s, e, w, phase, tp = state
+    if max(n, s, e, w) > PACKED_LANE_MASK - PACKED_HEADROOM:
+        raise ValueError(f"lane count too large for a packed state: {state}")
+    x = min(tp, PACKED_TP_CAP) << PACKED_TP_SHIFT
+    if phase == "EW":
+        x |= 1 << 48
+    if n > s:
+        x |= 1 << 49
+        n, s = s, n
+    if e > w:
+        x |= 1 << 50
+        e, w = w, e
+    return x | n | s << 12 | e << 24 | w << 36
+
+
+def decode_state(x):
+    low, high = x & PACKED_LANE_MASK, x >> 12 & PACKED_LANE_MASK
+    n, s = (high, low) if x >> 49 & 1 else (low, high)
+    low, high = x >> 24 & PACKED_LANE_MASK, x >> 36 & PACKED_LANE_MASK
+    e, w = (high, low) if x >> 50 & 1 else (low, high)
+    return (n, s, e, w, "EW" if x >> 48 & 1 else "NS", x >> PACKED_TP_SHIFT)
+
+
+# The hot functions spell the layout out as literals, because a module
+# global costs a dict lookup per use: 4095 = lane mask, 0x1001001001 = one
+# car on every lane, 0x1000000000000 = phase bit, 0x6000000000000 = swap
+# bits, 0x8000000000000 = one tp step. Slicing x into 24-bit halves first
+# keeps the arithmetic on single-digit ints.
+
+def cost_packed(x):
+    ns = x & 0xFFFFFF
+    ew = x >> 24 & 0xFFFFFF
+    return (ns & 4095) + (ns >> 12) + (ew & 4095) + (ew >> 12)
+
+
+def heuristic_packed(x):
+    ns = x >> 12 & 4095
+    ew = x >> 36 & 4095
+    return ns if ns > ew else ew
+
+
+def transition_packed(x, action, min_green_time=3):
+    # transition_for_planning on a packed state: +1 car per lane, then the
+    # green pair loses up to two
+    tp = x >> 51
+    x += 0x1001001001
+    if action == "SWITCH" and tp >= min_green_time:
+        x = (x & 0x7FFFFFFFFFFFF) ^ 0x1000000000000
+    elif tp < 511:
+        x += 0x8000000000000
     
-    while queue:
-        path = queue.pop(0)
-        state, _ = path[-1]
-        
-        if state in visited:
-            continue
-        visited.append(state)
-        
-        if len(path) - 1 == horizon:
-            state_cost = cost(state)
-            if state_cost < best_cost:
-                best_cost = state_cost
-                best_action = path[1][1] if len(path) > 1 else "HOLD"
-            continue  
-        
-        for action in ["HOLD", "SWITCH"]:
-            next_state = transition_for_planning(state, action)
-            new_path = path.copy()
-            new_path.append((next_state, action))
-            queue.append(new_path)
+    if x & 0x1000000000000:
+        low = x >> 24 & 4095
+        if low >= 2:
+            return x - 0x2002000000
+        high = x >> 36 & 4095
+        x -= (low << 24) + ((high if high < 2 else 2) << 36)
+        # both lanes are empty now, so the pair is no longer swapped
+        return x & ~0x4000000000000 if high <= 2 else x
+    low = x & 4095
+    if low >= 2:
+        return x - 0x2002
+    high = x >> 12 & 4095
+    x -= low + ((high if high < 2 else 2) << 12)
+    return x & ~0x2000000000000 if high <= 2 else x
+
+
+def canonical_packed(x, min_green_time=3):
+    if x >> 51 > min_green_time:
+        x = (x & 0x7FFFFFFFFFFFF) | min_green_time << 51
+    if FOLD_SYMMETRIC_LANES:
+        return x & ~0x6000000000000
+    return x
+
+
+class PlanningModel:
+    # the functions a search needs from a state representation, plus the
+    # minimum green time they plan with; planners take model=PACKED_MODEL
+    # to search packed states instead of tuples. Every planner reads
+    # min_green_time from its model once per search and passes it on, so
+    # set_planning_min_green_time only has to update the two models.
+    def __init__(self, transition, cost, heuristic, canonical, min_green_time=3):
+        self.transition = transition
+        self.cost = cost
+        self.heuristic = heuristic
+        self.canonical = canonical
+        self.min_green_time = min_green_time
+
+
+TUPLE_MODEL = PlanningModel(transition_for_planning, cost, heuristic, canonical_state)
+PACKED_MODEL = PlanningModel(transition_packed, cost_packed, heuristic_packed, canonical_packed)
+
+
+# ==================== INSTRUMENTATION ====================
+
+class SearchStats:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.algorithms = {}
+        self.current = None
+        self.step = None
     
-    return best_action
+    def new_bucket(self):
+        return {
+            'steps': 0,
+            'generated': 0,
+            'expanded': 0,
+            'duplicates': 0,
+            'peak_frontier': 0,
+            'peak_bytes': 0,
+            # constant memory however long the run
+            'latency': RunningStat(),
+            'histogram': LatencyHistogram()
+        }
+    
+    def begin(self, algorithm_name):
+        if algorithm_name not in self.algorithms:
+            self.algorithms[algorithm_name] = self.new_bucket()
+        self.current = self.algorithms[algorithm_name]
+    
+    def record_search(self, generated, expanded, duplicates, peak_frontier):
+        # planners call this once per search; iddfs reports every depth
+        bucket = self.current
+        if bucket is None:
+            return
+        bucket['generated'] += generated
+        bucket['expanded'] += expanded
+        bucket['duplicates'] += duplicates
+        if peak_frontier > bucket['peak_frontier']:
+            bucket['peak_frontier'] = peak_frontier
+    
+    def record_step(self, latency_ns, peak_bytes=0):
+        bucket = self.current
+        if bucket is None:
+            return
+        bucket['steps'] += 1
+        bucket['latency'].add(latency_ns)
+        bucket['histogram'].add(latency_ns)
+        if peak_bytes > bucket['peak_bytes']:
+            bucket['peak_bytes'] = peak_bytes
+    
+    def merge(self, algorithm_name, other):
+        self.begin(algorithm_name)
+        bucket = self.current
+        for field in ('steps', 'generated', 'expanded', 'duplicates'):
+            bucket[field] += other[field]
+        bucket['peak_frontier'] = max(bucket['peak_frontier'], other['peak_frontier'])
+        bucket['peak_bytes'] = max(bucket['peak_bytes'], other['peak_bytes'])
+        bucket['latency'].merge(other['latency'])
+        bucket['histogram'].merge(other['histogram'])
+    
+    def summary(self):
+        result = {}
+        for name, bucket in self.algorithms.items():
+            steps = bucket['steps'] or 1
+            histogram = bucket['histogram']
+            # bucket upper edges can overshoot the exact maximum
+            top = bucket['latency'].max if bucket['steps'] else 0
+            result[name] = {
+                'steps': bucket['steps'],
+                'generated_per_step': bucket['generated'] / steps,
+                'expanded_per_step': bucket['expanded'] / steps,
+                'duplicates_per_step': bucket['duplicates'] / steps,
+                'peak_frontier': bucket['peak_frontier'],
+                'peak_bytes': bucket['peak_bytes'] if self.trace_memory else None,
+                'latency_ns': {
+                    'p50': min(histogram.percentile(50), top),
+                    'p95': min(histogram.percentile(95), top),
+                    'p99': min(histogram.percentile(99), top),
+                    'max': top
+                }
+            }
+        return result
+    
+    def to_json(self, path=None):
+        text = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+# None means instrumentation is off; planners only test this once per search
+search_stats = None
 
 
-def dfs(start_state, horizon):
-    visited = []
-    stack = [[(start_state, None)]]
+def enable_instrumentation(trace_memory=False):
+    global search_stats
+    search_stats = SearchStats(trace_memory)
+    return search_stats
+
+
+def disable_instrumentation():
+    global search_stats
+    stats = search_stats
+    search_stats = None
+    return stats
+
+
+ACTIONS = ("HOLD", "SWITCH")
+
+
+def first_action(node):
+    state, action, parent, depth = node
+    if parent is None:
+        return "HOLD"
+    while parent[2] is not None:
+        node = parent
+        parent = node[2]
+    return node[1]
+
+
+def search_core(start_state, horizon, lifo=False, budget=None, model=TUPLE_MODEL):
+    # nodes are (state, action, parent, depth); the path is only walked
+    # back through the parent pointers when a better leaf is found
+    transition, cost, canonical = model.transition, model.cost, model.canonical
+    mg = model.min_green_time
+    visited = set()
+    frontier = deque([(start_state, None, None, 0)])
+    pop = frontier.pop if lifo else frontier.popleft
     
     best_action = "HOLD"
     best_cost = float('inf')
+    pops = 0
+    expanded = 0
+    peak_frontier = 1
     
-    while stack:
-        path = stack.pop()
-        state, _ = path[-1]
+    while frontier:
+        node = pop()
+        pops += 1
+        state, _, _, depth = node
         
-        if state in visited:
+        key = (canonical(state, mg), depth)
+        if state in visited or key in visited:
             continue
-        visited.append(state)
+        visited.add(state)
+        visited.add(key)
+        expanded += 1
+        if budget is not None:
+            budget.spend()
         
-        if len(path) - 1 == horizon:
+        if depth == horizon:
             state_cost = cost(state)
             if state_cost < best_cost:
                 best_cost = state_cost
-                best_action = path[1][1] if len(path) > 1 else "HOLD"
-            continue  
+                best_action = first_action(node)
+            continue
         
-        for action in ["HOLD", "SWITCH"]:
-            next_state = transition_for_planning(state, action)
-            new_path = path.copy()
-            new_path.append((next_state, action))
-            stack.append(new_path)
+        for action in ACTIONS:
+            next_state = transition(state, action, mg)
+            frontier.append((next_state, action, node, depth + 1))
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
     
+    if search_stats is not None:
+        search_stats.record_search(pops - 1, expanded, pops - expanded, peak_frontier)
     return best_action
 
 
-def path_cost_ucs(path):
-    total_cost = 0
-    for (state, action) in path:
-        total_cost += cost(state)
-    return total_cost
+def bfs(start_state, horizon, budget=None, model=TUPLE_MODEL):
+    return search_core(start_state, horizon, lifo=False, budget=budget, model=model)
 
-def ucs(start_state, horizon):
-    visited = []
-    queue = [[(start_state, None)]]
-    
-    while queue:
-        queue.sort(key=path_cost_ucs)
-        path = queue.pop(0)
-        state, _ = path[-1]
-        
-        if state in visited:
-            continue
-        visited.append(state)
-        
-        if len(path) - 1 == horizon:
-            return path[1][1] if len(path) > 1 else "HOLD"
-        
-        for action in ["HOLD", "SWITCH"]:
-            next_state = transition_for_planning(state, action)
-            new_path = path.copy()
-            new_path.append((next_state, action))
-            queue.append(new_path)
-    
-    return "HOLD"
 
+def dfs(start_state, horizon, budget=None, model=TUPLE_MODEL):
+    return search_core(start_state, horizon, lifo=True, budget=budget, model=model)
 
-def a_star(start_state, horizon):
- 
-    open_list = [(start_state, [(start_state, None)], 0)]
-    closed = []
+
+def ucs(start_state, horizon, budget=None, model=TUPLE_MODEL):
+    # heap entries are (g, seq, node); seq keeps ties in insertion order
+    transition, cost, canonical = model.transition, model.cost, model.canonical
+    mg = model.min_green_time
+    counter = itertools.count()
+    start_cost = cost(start_state)
+    frontier = [(start_cost, next(counter), (start_state, None, None, 0))]
+    visited = set()
+    best_g = {(canonical(start_state, mg), 0): start_cost}
+    
+    best_action = "HOLD"
+    generated = 0
+    expanded = 0
+    duplicates = 0
+    peak_frontier = 1
     
-    while open_list:
-        min_f = float('inf')  
-        best_index = 0  
-        for i in range(len(open_list)):
-            state, path, g = open_list[i]
-            f = g + heuristic(state)
-            if f < min_f:
-                min_f = f
-                best_index = i
+    while frontier:
+        g, _, node = heapq.heappop(frontier)
+        state, _, _, depth = node
         
-        state, path, g = open_list.pop(best_index)
-        closed.append(state)
+        key = (canonical(state, mg), depth)
+        if state in visited or key in visited:
+            duplicates += 1
+            continue
+        visited.add(state)
+        visited.add(key)
+        expanded += 1
+        if budget is not None:
+            budget.spend()
         
-        if len(path) - 1 == horizon:
-            return path[1][1] if len(path) > 1 else "HOLD"
+        if depth == horizon:
+            best_action = first_action(node)
+            break
         
-        for action in ["HOLD", "SWITCH"]:
-            next_state = transition_for_planning(state, action)
-            if next_state not in closed:
-                new_g = g + cost(next_state)
-                new_path = path + [(next_state, action)]
-                open_list.append((next_state, new_path, new_g))
+        for action in ACTIONS:
+            next_state = transition(state, action, mg)
+            generated += 1
+            new_g = g + cost(next_state)
+            key = (canonical(next_state, mg), depth + 1)
+            if best_g.get(key, float('inf')) <= new_g:
+                duplicates += 1
+                continue
+            best_g[key] = new_g
+            heapq.heappush(frontier, (new_g, next(counter), (next_state, action, node, depth + 1)))
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
     
-    return "HOLD"
+    if search_stats is not None:
+        search_stats.record_search(generated, expanded, duplicates, peak_frontier)
+    return best_action
 
 
-def dfs_limited(start_state, depth_limit):
-    visited = []
-    stack = [[(start_state, None)]]
+def a_star(start_state, horizon, budget=None, model=TUPLE_MODEL):
+    # heap entries are (f, seq, g, node); seq keeps ties in insertion order
+    transition, cost, heuristic, canonical = model.transition, model.cost, model.heuristic, model.canonical
+    mg = model.min_green_time
+    counter = itertools.count()
+    frontier = [(heuristic(start_state), next(counter), 0, (start_state, None, None, 0))]
+    closed = set()
+    # a state can be reached again at another depth and is re-expanded
+    # there, so best g is tracked per (state, depth)
+    best_g = {(canonical(start_state, mg), 0): 0}
     
     best_action = "HOLD"
-    best_cost = float('inf')
+    generated = 0
+    expanded = 0
+    duplicates = 0
+    peak_frontier = 1
     
-    while stack:
-        path = stack.pop()
-        state, _ = path[-1]
+    while frontier:
+        f, _, g, node = heapq.heappop(frontier)
+        state, _, _, depth = node
+        closed.add(state)
+        expanded += 1
+        if budget is not None:
+            budget.spend()
         
-        if state in visited:
-            continue
-        visited.append(state)
-        
-        if len(path) - 1 == depth_limit:
-            state_cost = cost(state)
-            if state_cost < best_cost:
-                best_cost = state_cost
-                best_action = path[1][1] if len(path) > 1 else "HOLD"
-            continue  
+        if depth == horizon:
+            best_action = first_action(node)
+            break
         
-        for action in ["HOLD", "SWITCH"]:
-            next_state = transition_for_planning(state, action)
-            new_path = path.copy()
-            new_path.append((next_state, action))
-            stack.append(new_path)
+        for action in ACTIONS:
+            next_state = transition(state, action, mg)
+            generated += 1
+            if next_state in closed:
+                duplicates += 1
+                continue
+            new_g = g + cost(next_state)
+            key = (canonical(next_state, mg), depth + 1)
+            if best_g.get(key, float('inf')) <= new_g:
+                duplicates += 1
+                continue
+            best_g[key] = new_g
+            heapq.heappush(frontier, (new_g + heuristic(next_state), next(counter), new_g,
+                                      (next_state, action, node, depth + 1)))
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
     
+    if search_stats is not None:
+        search_stats.record_search(generated, expanded, duplicates, peak_frontier)
     return best_action
 
-def iddfs(start_state, horizon):
+
+def dfs_limited(start_state, depth_limit, budget=None, model=TUPLE_MODEL):
+    return search_core(start_state, depth_limit, lifo=True, budget=budget, model=model)
+
+def iddfs(start_state, horizon, budget=None, model=TUPLE_MODEL):
+    # a budget that runs out propagates BudgetExhausted; anytime_plan does
+    # the deadline-bounded deepening and keeps the last finished depth
     best_action = "HOLD"
     for depth in range(1, horizon + 1):
-        best_action = dfs_limited(start_state, depth)
+        best_action = dfs_limited(start_state, depth, budget, model)
     return best_action
 
 
-def run_simulation(algorithm_func, algorithm_name, total_time=300, horizon=10, verbose=False):
-    north = 0
-    south = 0
-    east = 0
-    west = 0
-    phase = "NS"
-    time_in_phase = 0
-    
-    total_waiting = 0  
-    switches = 0  
-    step_times = []  
+# the five search planners on packed states: same searches, same
+# decisions, states encoded once at the boundary
+def bfs_packed(start_state, horizon, budget=None):
+    return bfs(encode_state(start_state), horizon, budget, PACKED_MODEL)
+
+
+def dfs_packed(start_state, horizon, budget=None):
+    return dfs(encode_state(start_state), horizon, budget, PACKED_MODEL)
+
+
+def ucs_packed(start_state, horizon, budget=None):
+    return ucs(encode_state(start_state), horizon, budget, PACKED_MODEL)
+
+
+def a_star_packed(start_state, horizon, budget=None):
+    return a_star(encode_state(start_state), horizon, budget, PACKED_MODEL)
+
+
+def iddfs_packed(start_state, horizon, budget=None):
+    return iddfs(encode_state(start_state), horizon, budget, PACKED_MODEL)
+
+
+def dfs_limited_packed(start_state, depth_limit, budget=None):
+    return dfs_limited(encode_state(start_state), depth_limit, budget, PACKED_MODEL)
+
+
+# ==================== ANYTIME PLANNING ====================
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class SearchBudget:
+    def __init__(self, time_budget=None, node_budget=None):
+        # time_budget is in seconds and node_budget counts expansions;
+        # both are shared by every depth of an anytime search
+        self.deadline = None
+        if time_budget is not None:
+            self.deadline = time.perf_counter_ns() + int(time_budget * 1e9)
+        self.nodes_left = node_budget
     
-    if verbose:
-        print(f"\n{'='*70}")
-        print(f"Algorithm: {algorithm_name}")
-        print(f"{'='*70}")
-        print(f"{'Time':<8} {'N':<6} {'S':<6} {'E':<6} {'W':<6} {'Phase':<8} {'Action':<8} {'Total':<8}")
-        print("-" * 70)
+    def spend(self):
+        if self.nodes_left is not None:
+            self.nodes_left -= 1
+            if self.nodes_left < 0:
+                raise BudgetExhausted()
+        if self.deadline is not None and time.perf_counter_ns() > self.deadline:
+            raise BudgetExhausted()
+
+
+def anytime_plan(start_state, horizon, time_budget=None, node_budget=None, planner=None):
+    # deepens one level at a time and keeps the action of the deepest
+    # search that finished inside the budget
+    if planner is None or planner is iddfs:
+        planner = dfs_limited
+    elif planner is iddfs_packed:
+        planner = dfs_limited_packed
+    budget = SearchBudget(time_budget, node_budget)
     
-    for t in range(total_time):
-        state = (north, south, east, west, phase, time_in_phase)
-        
-        start_time = time.time()
-        action = algorithm_func(state, horizon)
-        step_times.append(time.time() - start_time)
-        
-        north, south, east, west, phase, time_in_phase = transition_for_simulation(state, action)
-        
-        if action == "SWITCH":
-            switches += 1
-        
-        cars_waiting = north + south + east + west
-        total_waiting += cars_waiting
-        
-        if verbose and t % 10 == 0:
-            print(f"{t:<8} {north:<6} {south:<6} {east:<6} {west:<6} {phase:<8} {action:<8} {cars_waiting:<8}")
+    best_action = "HOLD"
+    depth_reached = 0
+    for depth in range(1, horizon + 1):
+        try:
+            best_action = planner(start_state, depth, budget=budget)
+        except BudgetExhausted:
+            break
+        depth_reached = depth
     
-    avg_waiting = total_waiting / total_time  
-    avg_step_time = sum(step_times) / len(step_times)  
+    return best_action, depth_reached
+
+
+def anytime_planner(planner=None, time_budget=None, node_budget=None):
+    # wraps anytime_plan in the (state, horizon) -> action signature used by
+    # run_simulation and the GUI; the depth of the last call is kept on it
+    def plan(start_state, horizon):
+        action, depth = anytime_plan(start_state, horizon, time_budget, node_budget, planner)
+        plan.last_depth = depth
+        if depth < horizon:
+            plan.truncated += 1
+        return action
     
-    return {
-        'algorithm': algorithm_name,
-        'total_waiting': total_waiting,
-        'avg_waiting': avg_waiting,
-        'switches': switches,
-        'avg_step_time': avg_step_time
-    }
+    plan.last_depth = 0
+    plan.truncated = 0
+    plan.cacheable = time_budget is None
+    return plan
 
 
-def compare_algorithms(total_time=300, horizon=10):
-    algorithms = [
-        (a_star, "A*"),
-        (bfs, "BFS"),
-        (dfs, "DFS"),
-        (ucs, "UCS"),
-        (iddfs, "IDDFS")
-    ]
+class LRUCache:
+    def __init__(self, maxsize=200000):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
     
-    print("\n" + "="*80)
-    print("AI-BASED INTELLIGENT TRAFFIC LIGHT CONTROL SYSTEM")
-    print("ALGORITHM COMPARISON")
-    print("="*80)
-    print(f"\nSimulation Parameters:")
-    print(f"  Total Time: {total_time} steps")
-    print(f"  Planning Horizon: {horizon} steps")
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
     
-    results = []
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
     
-    for algo_func, algo_name in algorithms:
-        print(f"\n{'='*80}")
-        print(f"Running {algo_name}...")
-        print(f"{'='*80}")
-        
-        result = run_simulation(algo_func, algo_name, total_time, horizon, verbose=True)
-        results.append(result)
+    def clear(self):
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
     
-    print("\n" + "="*80)
-    print("PERFORMANCE COMPARISON")
-    print("="*80)
-    print(f"{'Algorithm':<12} {'Total Wait':<15} {'Avg Wait':<15} {'Switches':<12} {'Avg Time(ms)':<15}")
-    print("-"*80)
+    def stats(self):
+        return {
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+# (state, remaining depth) -> (cumulative cost, best action); kept across
+# run_simulation calls so states reached again are not re-planned
+dp_cache = LRUCache()
+
+
+def dp_value(state, depth, budget=None):
+    if depth == 0:
+        return (0, "HOLD")
     
-    for r in results:
-        print(f"{r['algorithm']:<12} {r['total_waiting']:<15} {r['avg_waiting']:<15.2f} {r['switches']:<12} {r['avg_step_time']*1000:<15.3f}")
+    mg = TUPLE_MODEL.min_green_time
+    key = (canonical_state(state, mg), depth)
+    entry = dp_cache.get(key)
+    if entry is not None:
+        return entry
+    if budget is not None:
+        budget.spend()
     
-    best_waiting = min(results, key=lambda x: x['avg_waiting'])  
-    best_speed = min(results, key=lambda x: x['avg_step_time'])  
+    best = None
+    for action in ACTIONS:
+        next_state = transition_for_planning(state, action, mg)
+        value = cost(next_state) + dp_value(next_state, depth - 1, budget)[0]
+        if best is None or value < best[0]:
+            best = (value, action)
     
-    print("\n" + "="*80)
-    print("BEST PERFORMERS")
-    print("="*80)
-    print(f"Best Average Waiting Time: {best_waiting['algorithm']} ({best_waiting['avg_waiting']:.2f} cars)")
-    print(f"Fastest Execution: {best_speed['algorithm']} ({best_speed['avg_step_time']*1000:.3f} ms per step)")
-    print("\n")
+    dp_cache.put(key, best)
+    return best
+
+
+def dp_plan(start_state, horizon, budget=None):
+    if search_stats is None:
+        return dp_value(start_state, horizon, budget)[1]
     
-    return best_waiting['algorithm']
+    hits = dp_cache.hits
+    misses = dp_cache.misses
+    action = dp_value(start_state, horizon, budget)[1]
+    expanded = dp_cache.misses - misses
+    # the recursion stack is the DP's frontier
+    search_stats.record_search(2 * expanded, expanded, dp_cache.hits - hits, horizon)
+    return action
 
 
-# ==================== GUI IMPLEMENTATION ====================
+# ==================== BRANCH AND BOUND / BEAM ====================
 
-class TrafficLightGUI:
-    def __init__(self, root, algorithm_func, algorithm_name):
-        self.root = root
-        self.root.title(f"AI Traffic Light Control System - {algorithm_name}")
-        self.root.geometry("900x700")
-        self.root.resizable(False, False)
-        
-        self.algorithm_func = algorithm_func
-        self.algorithm_name = algorithm_name
-        
-        self.running = False  
-        self.paused = False   
-        self.north = 0        
-        self.south = 0        
-        self.east = 0         
-        self.west = 0         
-        self.phase = "NS"     
-        self.time_in_phase = 0  
-        self.current_step = 0   
-        self.total_steps = 300  
-        self.horizon = 10       
-        self.total_waiting = 0  
-        self.switches = 0       
-        self.delay = 500        
-        self.setup_gui()
-        
-        self.root.after(500, self.start_simulation)
-        
-    def setup_gui(self):
-        title_frame = tk.Frame(self.root, bg="#2c3e50", height=60)
-        title_frame.pack(fill=tk.X)  
-        title_label = tk.Label(title_frame, text=f"AI Traffic Light Control - {self.algorithm_name}", 
-                              font=("Arial", 20, "bold"), bg="#2c3e50", fg="white")
-        title_label.pack(pady=15)  
-        
-        self.canvas = tk.Canvas(self.root, width=600, height=450, bg="#34495e")
-        self.canvas.pack(pady=10) 
-        self.draw_intersection()
-        
-        info_frame = tk.Frame(self.root, bg="#ecf0f1")
-        info_frame.pack(fill=tk.X, padx=20, pady=5)
-        
-        left_info = tk.Frame(info_frame, bg="#ecf0f1")
-        left_info.pack(side=tk.LEFT, padx=10)
-        
-        self.step_label = tk.Label(left_info, text="Step: 0/300", 
-                                   font=("Arial", 12, "bold"), bg="#ecf0f1")
-        self.step_label.pack(anchor=tk.W) 
-        
-        self.phase_label = tk.Label(left_info, text="Phase: NS", 
-                                    font=("Arial", 12), bg="#ecf0f1", fg="#27ae60")
-        self.phase_label.pack(anchor=tk.W)
-        
-        self.action_label = tk.Label(left_info, text="Action: HOLD", 
-                                     font=("Arial", 12), bg="#ecf0f1")
-        self.action_label.pack(anchor=tk.W)
-        
-        right_info = tk.Frame(info_frame, bg="#ecf0f1")
-        right_info.pack(side=tk.RIGHT, padx=10)
-        
-        self.total_cars_label = tk.Label(right_info, text="Total Waiting: 0", 
-                                         font=("Arial", 12), bg="#ecf0f1")
-        self.total_cars_label.pack(anchor=tk.E) 
-        
-        self.avg_waiting_label = tk.Label(right_info, text="Avg Waiting: 0.00", 
-                                         font=("Arial", 12), bg="#ecf0f1")
-        self.avg_waiting_label.pack(anchor=tk.E)
-        
-        self.switches_label = tk.Label(right_info, text="Switches: 0", 
-                                      font=("Arial", 12), bg="#ecf0f1")
-        self.switches_label.pack(anchor=tk.E)
-        
-        button_frame = tk.Frame(self.root, bg="#ecf0f1")
-        button_frame.pack(pady=10)
-        
-        self.pause_btn = tk.Button(button_frame, text="Pause", 
-                                   command=self.toggle_pause,  
-                                   font=("Arial", 12, "bold"), bg="#f39c12", 
-                                   fg="white", width=15, height=2)
-        self.pause_btn.pack(side=tk.LEFT, padx=5)
+# Under transition_for_planning the red pair gains two cars per step and
+# the green pair loses at most two, so cost() never decreases along a
+# path. k * cost(state) is therefore an admissible lower bound on the
+# summed cost of the next k states.
 
-        self.reset_btn = tk.Button(button_frame, text="Reset", 
-                                   command=self.reset_simulation,  
-                                   font=("Arial", 12, "bold"), bg="#e74c3c", 
-                                   fg="white", width=15, height=2)
-        self.reset_btn.pack(side=tk.LEFT, padx=5)
+def cost_lower_bound(state, steps):
+    return steps * cost(state)
+
+
+def plan_value(start_state, actions):
+    state = start_state
+    total = 0
+    mg = TUPLE_MODEL.min_green_time
+    for action in actions:
+        state = transition_for_planning(state, action, mg)
+        total += cost(state)
+    return total
+
+
+def beam_actions(node):
+    # beam nodes are (state, g, action, parent)
+    actions = []
+    while node[3] is not None:
+        actions.append(node[2])
+        node = node[3]
+    actions.reverse()
+    return tuple(actions)
+
+
+def beam_search(start_state, horizon, beam_width=64, budget=None):
+    # level-synchronous beam; each level keeps the beam_width best
+    # candidates by g + lower bound, dropping duplicates of a canonical
+    # state that already have a lower g. Returns (value, actions).
+    beam = [(start_state, 0, None, None)]
+    mg = TUPLE_MODEL.min_green_time
+    generated = 0
+    duplicates = 0
+    
+    for depth in range(1, horizon + 1):
+        remaining = horizon - depth
+        best_g = {}
+        candidates = []
+        for node in beam:
+            state, g = node[0], node[1]
+            for action in ACTIONS:
+                next_state = transition_for_planning(state, action, mg)
+                generated += 1
+                new_g = g + cost(next_state)
+                key = canonical_state(next_state, mg)
+                if best_g.get(key, float('inf')) <= new_g:
+                    duplicates += 1
+                    continue
+                best_g[key] = new_g
+                candidates.append((next_state, new_g, action, node))
+            if budget is not None:
+                budget.spend()
         
-        speed_frame = tk.Frame(self.root, bg="#ecf0f1")
-        speed_frame.pack(pady=5)
+        beam = heapq.nsmallest(beam_width, candidates,
+                               key=lambda c: c[1] + cost_lower_bound(c[0], remaining))
+    
+    if search_stats is not None:
+        search_stats.record_search(generated, generated - duplicates, duplicates, beam_width)
+    
+    best = min(beam, key=lambda c: c[1])
+    return (best[1], beam_actions(best))
+
+
+def branch_and_bound(start_state, horizon, budget=None, incumbent=None):
+    # depth-first over HOLD before SWITCH, only accepting strict
+    # improvements, so ties go to HOLD exactly as in dp_plan.
+    # Returns (value, actions).
+    if horizon == 0:
+        return (0, ())
+    
+    # the incumbent plan (or a narrow beam) gives the starting bound; +1
+    # lets an equally good HOLD-first plan replace it (costs are integers)
+    if incumbent is None:
+        bound = beam_search(start_state, horizon, beam_width=8)[0]
+    else:
+        bound = plan_value(start_state, incumbent)
+    best = [bound + 1, ()]
+    mg = TUPLE_MODEL.min_green_time
+    seen = {}
+    path = []
+    counts = [0, 0, 0]
+    
+    def expand(state, depth, g):
+        if budget is not None:
+            budget.spend()
+        counts[1] += 1
+        remaining = horizon - depth
+        for action in ACTIONS:
+            next_state = transition_for_planning(state, action, mg)
+            counts[0] += 1
+            new_g = g + cost(next_state)
+            if new_g + cost_lower_bound(next_state, remaining - 1) >= best[0]:
+                continue
+            if remaining == 1:
+                best[0] = new_g
+                best[1] = tuple(path) + (action,)
+                continue
+            key = (canonical_state(next_state, mg), depth + 1)
+            if seen.get(key, float('inf')) <= new_g:
+                counts[2] += 1
+                continue
+            seen[key] = new_g
+            path.append(action)
+            expand(next_state, depth + 1, new_g)
+            path.pop()
+    
+    expand(start_state, 0, 0)
+    if search_stats is not None:
+        search_stats.record_search(counts[0], counts[1], counts[2], horizon)
+    return (best[0], best[1])
+
+
+def bnb_plan(start_state, horizon, budget=None):
+    actions = branch_and_bound(start_state, horizon, budget)[1]
+    return actions[0] if actions else "HOLD"
+
+
+def beam_plan(start_state, horizon, budget=None):
+    actions = beam_search(start_state, horizon, budget=budget)[1]
+    return actions[0] if actions else "HOLD"
+
+
+def receding_horizon_planner():
+    # Keeps the last branch_and_bound plan. On the next call it is shifted
+    # one step (padded with HOLD) and scored from the observed state, which
+    # gives B&B its starting bound instead of a fresh beam search. The
+    # chosen action is the same as a cold bnb_plan call.
+    def plan(start_state, horizon, budget=None):
+        incumbent = None
+        if plan.actions:
+            shifted = plan.actions[1:horizon + 1]
+            incumbent = shifted + ("HOLD",) * (horizon - len(shifted))
+        value, actions = branch_and_bound(start_state, horizon, budget, incumbent)
+        plan.actions = actions
+        plan.value = value
+        return actions[0] if actions else "HOLD"
+    
+    plan.actions = ()
+    plan.value = None
+    return plan
+
+
+# planner -> factory of a stateful warm-started twin that makes the same
+# decisions; run_simulation(warm_start=True) and the GUI build one per run
+WARM_STARTS = {bnb_plan: receding_horizon_planner}
+
+
+def warm_start_planner(algorithm_func):
+    factory = WARM_STARTS.get(algorithm_func)
+    if factory is None:
+        supported = ", ".join(func.__name__ for func in WARM_STARTS)
+        raise ValueError(f"{algorithm_func.__name__} has no warm start (supported: {supported})")
+    return factory()
+
+
+# ==================== POLICY TABLE ====================
+
+# header: magic, version, horizon, max_queue, min_green_time; followed by
+# one bit per canonical state (0 = HOLD, 1 = SWITCH)
+POLICY_TABLE_HEADER = struct.Struct("<4sHHHH")
+POLICY_TABLE_MAGIC = b"TLPT"
+POLICY_TABLE_VERSION = 1
+
+
+def lane_pair_index(a, b):
+    if a > b:
+        a, b = b, a
+    return b * (b + 1) // 2 + a
+
+
+def policy_table_size(max_queue, min_green_time=3):
+    pairs = (max_queue + 1) * (max_queue + 2) // 2
+    return pairs * pairs * 2 * (min_green_time + 1)
+
+
+def policy_table_index(state, max_queue, min_green_time=3):
+    n, s, e, w, phase, tp = state
+    pairs = (max_queue + 1) * (max_queue + 2) // 2
+    index = lane_pair_index(n, s) * pairs + lane_pair_index(e, w)
+    index = index * 2 + (0 if phase == "NS" else 1)
+    return index * (min_green_time + 1) + min(tp, min_green_time)
+
+
+def compile_policy_block(args):
+    # one block per N/S pair; returns a 0/1 byte per state in index order
+    ns_index, horizon, max_queue, min_green_time, planner = args
+    s = 0
+    while (s + 1) * (s + 2) // 2 <= ns_index:
+        s += 1
+    n = ns_index - s * (s + 1) // 2
+    
+    block = bytearray()
+    for w in range(max_queue + 1):
+        for e in range(w + 1):
+            for phase in ("NS", "EW"):
+                for tp in range(min_green_time + 1):
+                    action = planner((n, s, e, w, phase, tp), horizon)
+                    block.append(1 if action == "SWITCH" else 0)
+    return block
+
+
+def compile_policy(path, horizon=10, max_queue=63, min_green_time=3, planner=None, processes=None):
+    # the table stores one decision per canonical state, so only planners
+    # that decide on the canonical state alone can be compiled, and only
+    # under the planning model the table is labelled with
+    if planner is None:
+        planner = dp_plan
+    if planner not in CANONICAL_PLANNERS:
+        raise ValueError(f"{planner.__name__} depends on more than the canonical state "
+                         f"(use one of {', '.join(sorted(p.__name__ for p in CANONICAL_PLANNERS))})")
+    if min_green_time != planning_min_green_time():
+        raise ValueError(f"planners use min_green_time={planning_min_green_time()}, "
+                         f"call set_planning_min_green_time({min_green_time}) first")
+    pairs = (max_queue + 1) * (max_queue + 2) // 2
+    jobs = [(ns_index, horizon, max_queue, min_green_time, planner) for ns_index in range(pairs)]
+    
+    if processes == 1:
+        blocks = map(compile_policy_block, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        blocks = pool.imap(compile_policy_block, jobs, chunksize=4)
+    
+    bits = bytearray((policy_table_size(max_queue, min_green_time) + 7) // 8)
+    index = 0
+    try:
+        for block in blocks:
+            for value in block:
+                if value:
+                    bits[index >> 3] |= 1 << (index & 7)
+                index += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    
+    with open(path, "wb") as f:
+        f.write(POLICY_TABLE_HEADER.pack(POLICY_TABLE_MAGIC, POLICY_TABLE_VERSION,
+                                         horizon, max_queue, min_green_time))
+        f.write(bits)
+    return index
+
+
+class PolicyTable:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.horizon, self.max_queue, self.min_green_time = \
+            POLICY_TABLE_HEADER.unpack_from(self.data)
+        if magic != POLICY_TABLE_MAGIC or version != POLICY_TABLE_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {POLICY_TABLE_VERSION} policy table")
+        self.pairs = (self.max_queue + 1) * (self.max_queue + 2) // 2
+        self.offset = POLICY_TABLE_HEADER.size
+    
+    def lookup(self, state):
+        n, s, e, w, phase, tp = state
+        limit = self.max_queue
+        if n > limit or s > limit or e > limit or w > limit:
+            return None
+        index = policy_table_index(state, limit, self.min_green_time)
+        if self.data[self.offset + (index >> 3)] >> (index & 7) & 1:
+            return "SWITCH"
+        return "HOLD"
+    
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+policy_table = None
+
+
+def load_policy_table(path):
+    global policy_table
+    if policy_table is not None:
+        policy_table.close()
+    policy_table = PolicyTable(path)
+    return policy_table
+
+
+def table_policy(start_state, horizon):
+    # a table compiled for another horizon or planning model falls back to
+    # live search
+    table = policy_table
+    if table is not None and table.horizon == horizon and table.min_green_time == planning_min_green_time():
+        action = table.lookup(start_state)
+        if action is not None:
+            return action
+    return dp_plan(start_state, horizon)
+
+
+# ==================== BATCHED DECISIONS ====================
+
+# decisions are cached per (planner, horizon, decision_key) and shared
+# by every intersection, seed and tick that asks
+plan_cache = LRUCache(maxsize=100000)
+
+
+def decision_key(algorithm, state):
+    # planners in CANONICAL_PLANNERS decide the same for a state and its
+    # canonical form, so mirrored states and long greens share an entry;
+    # the rest are keyed on the raw state
+    if algorithm in CANONICAL_PLANNERS:
+        return canonical_state(state, TUPLE_MODEL.min_green_time)
+    return state
+
+
+def plan_job(job):
+    algo_func, state, horizon = job
+    return algo_func(state, horizon)
+
+
+def plan_batch(states, horizon, algorithm, cache=None, pool=None):
+    # -> one "HOLD"/"SWITCH" per state; algorithm is a planner function or
+    # a name accepted by find_algorithm. Repeats within the batch are
+    # planned once, from the first raw state seen for their key, and the
+    # unique misses go to pool.map when a multiprocessing pool is given.
+    if isinstance(algorithm, str):
+        algorithm = find_algorithm(algorithm)[0]
+    if not getattr(algorithm, 'cacheable', True):
+        # time-budgeted planners can answer differently next time
+        cache = LRUCache(maxsize=len(states))
+    elif cache is None:
+        cache = plan_cache
+    
+    keys = []
+    missing = {}
+    decided = {}
+    for state in states:
+        key = (algorithm, horizon, decision_key(algorithm, state))
+        keys.append(key)
+        if key in decided or key in missing:
+            continue
+        action = cache.get(key)
+        if action is None:
+            missing[key] = state
+        else:
+            decided[key] = action
+    
+    if missing:
+        jobs = [(algorithm, state, horizon) for state in missing.values()]
+        if pool is not None and len(jobs) > 1:
+            actions = pool.map(plan_job, jobs)
+        else:
+            actions = [algorithm(state, horizon) for state in missing.values()]
+        for key, action in zip(missing, actions):
+            cache.put(key, action)
+            decided[key] = action
+    
+    return [decided[key] for key in keys]
+
+
+def benchmark_plan_batch(algorithm, horizon=10, batch_sizes=(1, 10, 100, 1000), ticks=20,
+                         seed=0, processes=None):
+    # batch_size intersections advance together for ticks steps, asking
+    # for all their decisions in one plan_batch call per tick; returns
+    # one row per batch size with decisions/sec and the cache hit rate
+    algo_func, algo_name = find_algorithm(algorithm) if isinstance(algorithm, str) else (algorithm, algorithm.__name__)
+    pool = multiprocessing.Pool(processes) if processes != 1 else None
+    rows = []
+    try:
+        for batch_size in batch_sizes:
+            rng = random.Random(seed)
+            cache = LRUCache(maxsize=plan_cache.maxsize)
+            states = [(0, 0, 0, 0, "NS", 0)] * batch_size
+            elapsed = 0.0
+            unique = 0
+            for _ in range(ticks):
+                unique += len({decision_key(algo_func, state) for state in states})
+                start_time = time.perf_counter()
+                actions = plan_batch(states, horizon, algo_func, cache=cache, pool=pool)
+                elapsed += time.perf_counter() - start_time
+                states = [transition_for_simulation(state, action, rng=rng)
+                          for state, action in zip(states, actions)]
+            
+            decisions = batch_size * ticks
+            rows.append({
+                'algorithm': algo_name,
+                'batch_size': batch_size,
+                'decisions': decisions,
+                'decisions_per_sec': decisions / elapsed if elapsed > 0 else float('inf'),
+                'unique_fraction': unique / decisions,
+                'hit_rate': cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0
+            })
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return rows
+
+
+# ==================== BATCH SIMULATION ====================
+
+# batch states mirror the scalar tuple layout with one array per field:
+# (north, south, east, west, phase, time_in_phase), phase 0 = NS, 1 = EW
+
+def require_numpy():
+    if np is None:
+        raise ImportError("the batch simulator needs NumPy (pip install numpy)")
+
+
+def initial_batch_state(runs):
+    require_numpy()
+    lanes = [np.zeros(runs, dtype=np.int32) for _ in range(4)]
+    return (*lanes, np.zeros(runs, dtype=np.int8), np.zeros(runs, dtype=np.int32))
+
+
+def transition_for_simulation_batch(state, switch, arrivals, departures, min_green_time=3):
+    # arrivals and departures are (4, runs) draws in N, S, E, W order; a
+    # departure draw is only applied to the lanes that end up green
+    n, s, e, w, phase, tp = state
+    
+    n = n + arrivals[0]
+    s = s + arrivals[1]
+    e = e + arrivals[2]
+    w = w + arrivals[3]
+    
+    flip = switch & (tp >= min_green_time)
+    new_phase = np.where(flip, 1 - phase, phase).astype(np.int8)
+    new_tp = np.where(flip, 0, tp + 1)
+    
+    ns_green = new_phase == 0
+    n = np.where(ns_green, np.maximum(0, n - departures[0]), n)
+    s = np.where(ns_green, np.maximum(0, s - departures[1]), s)
+    e = np.where(ns_green, e, np.maximum(0, e - departures[2]))
+    w = np.where(ns_green, w, np.maximum(0, w - departures[3]))
+    
+    return (n, s, e, w, new_phase, new_tp)
+
+
+def scalar_batch_policy(algorithm_func, cache=None, pool=None):
+    # adapts a scalar planner: each distinct state in the batch goes
+    # through plan_batch once, so repeats across steps hit plan_cache
+    def policy(state, horizon):
+        rows = np.stack(state, axis=1)
+        unique_rows, inverse = np.unique(rows, axis=0, return_inverse=True)
+        scalar_states = [(n, s, e, w, "NS" if phase == 0 else "EW", tp)
+                         for n, s, e, w, phase, tp in unique_rows.tolist()]
+        actions = plan_batch(scalar_states, horizon, algorithm_func, cache=cache, pool=pool)
+        decisions = np.array([action == "SWITCH" for action in actions], dtype=bool)
+        return decisions[inverse.reshape(-1)]
+    return policy
+
+
+def table_batch_policy(table, fallback=None):
+    # vectorized PolicyTable lookup; out-of-range rows go to the fallback
+    bits = np.frombuffer(table.data, dtype=np.uint8, offset=table.offset)
+    limit = table.max_queue
+    pairs = table.pairs
+    cap = table.min_green_time
+    fallback_policy = scalar_batch_policy(fallback or dp_plan)
+    
+    def pair_index(a, b):
+        low = np.minimum(a, b).astype(np.int64)
+        high = np.maximum(a, b).astype(np.int64)
+        return high * (high + 1) // 2 + low
+    
+    def policy(state, horizon):
+        if horizon != table.horizon or cap != planning_min_green_time():
+            return fallback_policy(state, horizon)
+        n, s, e, w, phase, tp = state
+        in_range = (np.maximum(np.maximum(n, s), np.maximum(e, w)) <= limit)
+        index = pair_index(n, s) * pairs + pair_index(e, w)
+        index = (index * 2 + phase) * (cap + 1) + np.minimum(tp, cap)
+        index = np.where(in_range, index, 0)
+        decisions = (bits[index >> 3] >> (index & 7).astype(np.uint8)) & 1 == 1
+        if not in_range.all():
+            outside = ~in_range
+            decisions[outside] = fallback_policy(tuple(field[outside] for field in state), horizon)
+        return decisions
+    return policy
+
+
+def run_simulation_batch(batch_policy, algorithm_name, runs=1000, total_time=300, horizon=10,
+                         seed=None, chunk_steps=256):
+    require_numpy()
+    rng = np.random.default_rng(seed)
+    state = initial_batch_state(runs)
+    
+    total_waiting = np.zeros(runs, dtype=np.int64)
+    switches = np.zeros(runs, dtype=np.int64)
+    policy_time = 0.0
+    
+    for chunk_start in range(0, total_time, chunk_steps):
+        steps = min(chunk_steps, total_time - chunk_start)
+        arrivals = rng.integers(0, 3, size=(steps, 4, runs), dtype=np.int8)
+        departures = rng.integers(1, 4, size=(steps, 4, runs), dtype=np.int8)
         
-        tk.Label(speed_frame, text="Speed:", font=("Arial", 10), bg="#ecf0f1").pack(side=tk.LEFT, padx=5)
+        for t in range(steps):
+            start_time = time.perf_counter()
+            switch = batch_policy(state, horizon)
+            policy_time += time.perf_counter() - start_time
+            
+            state = transition_for_simulation_batch(state, switch, arrivals[t], departures[t])
+            switches += switch
+            total_waiting += state[0] + state[1] + state[2] + state[3]
+    
+    avg_waiting = total_waiting / total_time
+    
+    return {
+        'algorithm': algorithm_name,
+        'runs': runs,
+        'total_waiting': total_waiting,
+        'avg_waiting': float(avg_waiting.mean()),
+        'avg_waiting_std': float(avg_waiting.std()),
+        'switches': switches,
+        'avg_step_time': policy_time / total_time
+    }
+
+
+# ==================== MONTE CARLO PLANNING ====================
+
+# The search planners optimize the deterministic planning model (+1 car,
+# -2 cars). monte_carlo_plan scores HOLD and SWITCH against the
+# randomized simulation dynamics instead: every rollout draws one traffic
+# sample, plays it after HOLD and after SWITCH (common random numbers, so
+# the two costs are compared pairwise) and then plays longest queue first
+# up to the horizon. Rollouts run as NumPy batches of batch_size.
+MC_ROLLOUTS = 512
+MC_BATCH_SIZE = 256
+# default per-decision budget of monte_carlo_planner and simulate; mc_plan
+# always runs all MC_ROLLOUTS so its decisions can be cached
+MC_TIME_BUDGET = 0.05
+
+
+def monte_carlo_job(job):
+    # one batch of paired rollouts -> (sum of SWITCH minus HOLD cost,
+    # rollouts); a batch that starts after the deadline is skipped, except
+    # batch 0 so there is always an answer
+    start_state, horizon, batch_size, entropy, deadline, arrival_range, departure_range, min_green_time = job
+    if entropy[-1] > 0 and deadline is not None and time.monotonic() > deadline:
+        return (0, 0)
+    
+    # transition_for_simulation_batch with the lanes in one (4, width)
+    # array, which halves the NumPy calls per step; columns below
+    # batch_size start with HOLD, the rest with SWITCH
+    rng = np.random.default_rng(entropy)
+    n, s, e, w, phase, tp = start_state
+    width = 2 * batch_size
+    lanes = np.empty((4, width), dtype=np.int32)
+    lanes.T[:] = (n, s, e, w)
+    ew = np.full(width, phase == "EW")
+    tp = np.full(width, tp, dtype=np.int32)
+    green = np.empty((4, width), dtype=bool)
+    switch = np.zeros(width, dtype=bool)
+    switch[batch_size:] = True
+    
+    # both halves see the same draws
+    low, high = arrival_range
+    arrivals = rng.integers(low, high + 1, size=(horizon, 4, batch_size), dtype=np.int32)
+    arrivals = np.concatenate((arrivals, arrivals), axis=2)
+    low, high = departure_range
+    departures = rng.integers(low, high + 1, size=(horizon, 4, batch_size), dtype=np.int32)
+    departures = np.concatenate((departures, departures), axis=2)
+    
+    total = np.zeros(width, dtype=np.int64)
+    for t in range(horizon):
+        if t > 0:
+            # rollout policy, longest queue first: switch once the red
+            # pair holds more cars than the green one
+            ns_cars = lanes[0] + lanes[1]
+            ew_cars = lanes[2] + lanes[3]
+            switch = np.where(ew, ns_cars > ew_cars, ew_cars > ns_cars)
+        lanes += arrivals[t]
+        flip = switch & (tp >= min_green_time)
+        ew ^= flip
+        tp += 1
+        tp[flip] = 0
+        green[0] = green[1] = ~ew
+        green[2] = green[3] = ew
+        lanes -= np.minimum(lanes, departures[t] * green)
+        total += lanes.sum(axis=0)
+    
+    return (int(total[batch_size:].sum() - total[:batch_size].sum()), batch_size)
+
+
+def monte_carlo_plan(start_state, horizon, budget=None, *, rollouts=MC_ROLLOUTS, batch_size=MC_BATCH_SIZE,
+                     time_budget=None, pool=None, seed=0, arrival_range=(0, 2),
+                     departure_range=(1, 3), min_green_time=None):
+    # Picks SWITCH when it costs less than HOLD on average over the paired
+    # rollouts, ties go to HOLD. Batches are seeded from seed, the
+    # canonical state and the batch index, so without a time_budget a
+    # decision only depends on the canonical state and pooled runs match
+    # inline ones. time_budget (seconds) stops sampling early and answers
+    # from the batches done; budget is the shared SearchBudget of anytime
+    # mode, spent per batch.
+    require_numpy()
+    if horizon == 0:
+        return "HOLD"
+    if min_green_time is None:
+        min_green_time = TUPLE_MODEL.min_green_time
+    start_state = canonical_state(start_state, min_green_time)
+    n, s, e, w, phase, tp = start_state
+    entropy = (seed, n, s, e, w, int(phase == "EW"), tp)
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    jobs = [(start_state, horizon, batch_size, entropy + (k,), deadline, arrival_range, departure_range,
+             min_green_time)
+            for k in range(max(1, -(-rollouts // batch_size)))]
+    
+    if pool is not None and len(jobs) > 1:
+        for _ in jobs:
+            if budget is not None:
+                budget.spend()
+        results = pool.map(monte_carlo_job, jobs)
+    else:
+        results = []
+        for job in jobs:
+            if results and deadline is not None and time.monotonic() > deadline:
+                break
+            if budget is not None:
+                budget.spend()
+            results.append(monte_carlo_job(job))
+    
+    difference = sum(result[0] for result in results)
+    done = sum(result[1] for result in results)
+    if search_stats is not None:
+        search_stats.record_search(2 * done * horizon, 2 * done, 0, 2 * batch_size)
+    return "SWITCH" if difference < 0 else "HOLD"
+
+
+def mc_plan(start_state, horizon, budget=None):
+    return monte_carlo_plan(start_state, horizon, budget)
+
+
+def monte_carlo_planner(rollouts=MC_ROLLOUTS, time_budget=MC_TIME_BUDGET, pool=None, seed=0):
+    # monte_carlo_plan with its settings bound, e.g. to hand a worker pool
+    # to run_simulation or the GUI. With a time_budget the answer depends
+    # on timing, so plan_batch does not cache it.
+    def plan(start_state, horizon, budget=None):
+        return monte_carlo_plan(start_state, horizon, budget, rollouts=rollouts, time_budget=time_budget,
+                                pool=pool, seed=seed)
+    plan.cacheable = time_budget is None
+    return plan
+
+
+# ==================== NETWORK SIMULATION ====================
+
+# A network is a set of intersections whose lanes are flattened to
+# approach * nodes + node (approach 0-3 = N, S, E, W, as in the batch
+# state). A link (src_node, src_approach, dst_node, dst_approach, delay)
+# carries the cars discharged from one lane onto another lane delay steps
+# later. Lanes without an incoming link get the usual 0-2 random arrivals;
+# cars discharged from lanes without an outgoing link leave the network.
+APPROACHES = ("N", "S", "E", "W")
+
+
+class TrafficNetwork:
+    def __init__(self, nodes, links=(), min_green_time=3):
+        require_numpy()
+        self.nodes = nodes
+        self.min_green_time = min_green_time
+        self.links = list(links)
         
-        self.speed_scale = tk.Scale(speed_frame, from_=100, to=2000, 
-                                    orient=tk.HORIZONTAL, length=200,
-                                    command=self.update_speed, bg="#ecf0f1")  
-        self.speed_scale.set(500) 
-        self.speed_scale.pack(side=tk.LEFT)
+        self.link_src = np.array([a * nodes + u for u, a, _, _, _ in self.links], dtype=np.int64)
+        self.link_dst = np.array([b * nodes + v for _, _, v, b, _ in self.links], dtype=np.int64)
+        self.link_delay = np.array([d for _, _, _, _, d in self.links], dtype=np.int64)
+        if len(self.links) and self.link_delay.min() < 1:
+            raise ValueError("link delays must be at least one step")
+        self.max_delay = int(self.link_delay.max()) if len(self.links) else 0
         
-        tk.Label(speed_frame, text="(Lower = Faster)", 
-                font=("Arial", 9, "italic"), bg="#ecf0f1", fg="gray").pack(side=tk.LEFT, padx=5)
+        fed = np.zeros(4 * nodes, dtype=bool)
+        fed[self.link_dst] = True
+        self.external = (~fed).reshape(4, nodes).astype(np.int8)
+        drains = np.zeros(4 * nodes, dtype=bool)
+        drains[self.link_src] = True
+        self.exits = np.flatnonzero(~drains)
+        # each lane feeds and is fed by at most one link in grids and
+        # corridors, so plain fancy-index += is safe; merges need add.at
+        self.unique_dst = len(np.unique(self.link_dst)) == len(self.links)
+    
+    @classmethod
+    def grid(cls, rows, cols, delay=2, min_green_time=3):
+        # node = row * cols + col, row 0 at the top; a car waiting on the N
+        # approach is heading south, so it continues onto the N approach of
+        # the node below, and so on for the other three directions
+        links = []
+        for row in range(rows):
+            for col in range(cols):
+                node = row * cols + col
+                if row + 1 < rows:
+                    links.append((node, 0, node + cols, 0, delay))
+                if row > 0:
+                    links.append((node, 1, node - cols, 1, delay))
+                if col > 0:
+                    links.append((node, 2, node - 1, 2, delay))
+                if col + 1 < cols:
+                    links.append((node, 3, node + 1, 3, delay))
+        return cls(rows * cols, links, min_green_time)
+    
+    @classmethod
+    def corridor(cls, length, delay=2, min_green_time=3):
+        # an east-west arterial; the N/S side streets are all boundary lanes
+        return cls.grid(1, length, delay, min_green_time)
+
+
+def run_network_simulation(network, batch_policy, algorithm_name, total_time=300, horizon=10,
+                           seed=None, chunk_steps=256, step_seconds=1.0):
+    # every node advances with transition_for_simulation_batch; the cars
+    # it discharges are pushed down the outgoing links and become
+    # arrivals at the downstream node when their delay runs out
+    require_numpy()
+    rng = np.random.default_rng(seed)
+    nodes = network.nodes
+    state = initial_batch_state(nodes)
+    
+    # in_transit[t % depth] holds the cars arriving at step t, per lane
+    depth = network.max_delay + 1
+    in_transit = np.zeros((depth, 4 * nodes), dtype=np.int32)
+    
+    total_waiting = 0
+    switches = np.zeros(nodes, dtype=np.int64)
+    exited = 0
+    policy_time = 0.0
+    start_time = time.perf_counter()
+    
+    for chunk_start in range(0, total_time, chunk_steps):
+        steps = min(chunk_steps, total_time - chunk_start)
+        arrivals = rng.integers(0, 3, size=(steps, 4, nodes), dtype=np.int8) * network.external
+        departures = rng.integers(1, 4, size=(steps, 4, nodes), dtype=np.int8)
+        
+        for t in range(steps):
+            step = chunk_start + t
+            slot = step % depth
+            step_arrivals = arrivals[t] + in_transit[slot].reshape(4, nodes)
+            in_transit[slot] = 0
+            
+            plan_start = time.perf_counter()
+            switch = batch_policy(state, horizon)
+            policy_time += time.perf_counter() - plan_start
+            
+            queued = np.stack(state[:4]) + step_arrivals
+            state = transition_for_simulation_batch(state, switch, step_arrivals, departures[t],
+                                                    network.min_green_time)
+            lanes = np.stack(state[:4])
+            discharged = (queued - lanes).reshape(-1)
+            
+            if network.links:
+                arrive_at = (step + network.link_delay) % depth
+                if network.unique_dst:
+                    in_transit[arrive_at, network.link_dst] += discharged[network.link_src]
+                else:
+                    np.add.at(in_transit, (arrive_at, network.link_dst), discharged[network.link_src])
+            exited += int(discharged[network.exits].sum())
+            
+            switches += switch
+            total_waiting += int(lanes.sum())
+    
+    elapsed = time.perf_counter() - start_time
+    
+    return {
+        'algorithm': algorithm_name,
+        'nodes': nodes,
+        'total_waiting': total_waiting,
+        'avg_waiting': total_waiting / (total_time * nodes) if total_time and nodes else 0,
+        'switches': switches,
+        'queued': int(np.stack(state[:4]).sum()),
+        'exited': exited,
+        'in_transit': int(in_transit.sum()),
+        'avg_step_time': elapsed / total_time if total_time else 0,
+        'avg_policy_time': policy_time / total_time if total_time else 0,
+        'realtime_factor': total_time * step_seconds / elapsed if elapsed > 0 else float('inf')
+    }
+
+
+# ==================== TRAFFIC TRACES ====================
+
+# A trace is a header (magic, version, step count) followed by one
+# little-endian uint16 per step: four arrival draws (0-2) in bits 0-7 and
+# two departure draws (1-3, stored minus one) in bits 8-11, two bits each,
+# in the order transition_for_simulation asks for them.
+TRACE_HEADER = struct.Struct("<4sHQ")
+TRACE_MAGIC = b"TLTR"
+TRACE_VERSION = 1
+DRAWS_PER_STEP = 6
+# a trace word holds 2 bits per draw, so only the default ranges fit
+TRACE_ARRIVAL_RANGE = (0, 2)
+TRACE_DEPARTURE_RANGE = (1, 3)
+
+
+def pack_draws(draws):
+    word = 0
+    for i, value in enumerate(draws):
+        word |= (value if i < 4 else value - 1) << (2 * i)
+    return word
+
+
+# every step outcome is equally likely, so recording draws one of these
+TRACE_WORDS = [pack_draws(draws) for draws in itertools.product(
+    range(3), range(3), range(3), range(3), range(1, 4), range(1, 4))]
+
+
+class TraceWriter:
+    def __init__(self, path, chunk_steps=1 << 16):
+        self.file = open(path, "wb")
+        self.file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, 0))
+        self.buffer = array.array("H")
+        self.chunk_steps = chunk_steps
+        self.steps = 0
+    
+    def write_word(self, word):
+        self.buffer.append(word)
+        if len(self.buffer) >= self.chunk_steps:
+            self.flush()
+    
+    def flush(self):
+        if sys.byteorder != "little":
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.steps += len(self.buffer)
+        self.buffer = array.array("H")
+    
+    def close(self):
+        self.flush()
+        self.file.seek(0)
+        self.file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, self.steps))
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingRNG:
+    # passes randint through to rng and records every step's draws, so a
+    # live run_simulation can be captured and replayed later
+    def __init__(self, writer, rng=random):
+        self.writer = writer
+        self.rng = rng
+        self.draws = []
+    
+    def randint(self, a, b):
+        value = self.rng.randint(a, b)
+        self.draws.append(value)
+        if len(self.draws) == DRAWS_PER_STEP:
+            self.writer.write_word(pack_draws(self.draws))
+            self.draws = []
+        return value
+
+
+def record_trace(path, total_steps, seed=None, chunk_steps=1 << 16):
+    rng = random.Random(seed)
+    words = TRACE_WORDS
+    with TraceWriter(path, chunk_steps) as writer:
+        for _ in range(total_steps):
+            writer.write_word(words[rng.randrange(729)])
+    return total_steps
+
+
+class TraceReplay:
+    # memory-maps a trace and serves its draws through randint(), so it
+    # can be passed anywhere transition_for_simulation takes an rng
+    def __init__(self, path, start_step=0):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = version = None
+        if len(self.data) >= TRACE_HEADER.size:
+            magic, version, self.steps = TRACE_HEADER.unpack_from(self.data)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            # words is not mapped yet, so close() cannot be used here
+            self.data.close()
+            self.file.close()
+            raise ValueError(f"{path} is not a version {TRACE_VERSION} traffic trace")
+        self.words = memoryview(self.data)[TRACE_HEADER.size:TRACE_HEADER.size + 2 * self.steps].cast("H")
+        self.step = start_step
+        self.draw = 0
+        self.word = 0
+    
+    def randint(self, a, b):
+        draw = self.draw
+        if draw == 0:
+            if self.step >= self.steps:
+                raise EOFError(f"traffic trace exhausted after {self.steps} steps")
+            self.word = self.words[self.step]
+            self.step += 1
+        self.draw = draw + 1 if draw < DRAWS_PER_STEP - 1 else 0
+        value = (self.word >> (2 * draw)) & 3
+        return value if draw < 4 else value + 1
+    
+    def close(self):
+        self.words.release()
+        self.data.close()
+        self.file.close()
+
+
+# ==================== STEP SINKS ====================
+
+# run_simulation hands every step to its sinks as a row
+# (t, north, south, east, west, phase, action, cars_waiting); start() is
+# called once per run with the algorithm name
+STEP_FIELDS = ("t", "north", "south", "east", "west", "phase", "action", "total")
+
+
+class ConsoleSink:
+    # the old verbose table: prints every `every`-th step
+    def __init__(self, every=10):
+        self.every = every
+    
+    def start(self, algorithm_name):
+        print(f"\n{'='*70}")
+        print(f"Algorithm: {algorithm_name}")
+        print(f"{'='*70}")
+        print(f"{'Time':<8} {'N':<6} {'S':<6} {'E':<6} {'W':<6} {'Phase':<8} {'Action':<8} {'Total':<8}")
+        print("-" * 70)
+    
+    def write(self, row):
+        t, north, south, east, west, phase, action, cars_waiting = row
+        if t % self.every == 0:
+            print(f"{t:<8} {north:<6} {south:<6} {east:<6} {west:<6} {phase:<8} {action:<8} {cars_waiting:<8}")
+    
+    def write_batch(self, rows):
+        for row in rows:
+            self.write(row)
+    
+    def close(self):
+        pass
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(("algorithm",) + STEP_FIELDS)
+        self.algorithm = ""
+    
+    def start(self, algorithm_name):
+        self.algorithm = algorithm_name
+    
+    def write(self, row):
+        self.writer.writerow((self.algorithm,) + row)
+    
+    def write_batch(self, rows):
+        algorithm = (self.algorithm,)
+        self.writer.writerows(algorithm + row for row in rows)
+    
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesSink:
+    def __init__(self, path):
+        self.file = open(path, "w")
+        self.algorithm = ""
+    
+    def start(self, algorithm_name):
+        self.algorithm = algorithm_name
+    
+    def write(self, row):
+        self.write_batch([row])
+    
+    def write_batch(self, rows):
+        algorithm = self.algorithm
+        self.file.write("".join(
+            json.dumps({"algorithm": algorithm, **dict(zip(STEP_FIELDS, row))}) + "\n" for row in rows))
+    
+    def close(self):
+        self.file.close()
+
+
+# columnar blocks: header (rows, name length), the algorithm name, then
+# each column as a contiguous little-endian array; phase and action are
+# stored as 0/1 (NS/EW, HOLD/SWITCH). Every write is a block, so use it
+# behind a BufferedSink.
+COLUMN_BLOCK_HEADER = struct.Struct("<IH")
+COLUMN_TYPES = ("I", "I", "I", "I", "I", "B", "B", "I")
+
+
+class ColumnarSink:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.algorithm = b""
+    
+    def start(self, algorithm_name):
+        self.algorithm = algorithm_name.encode()
+    
+    def write(self, row):
+        self.write_batch([row])
+    
+    def write_batch(self, rows):
+        if not rows:
+            return
+        self.file.write(COLUMN_BLOCK_HEADER.pack(len(rows), len(self.algorithm)))
+        self.file.write(self.algorithm)
+        columns = list(zip(*rows))
+        columns[5] = [0 if phase == "NS" else 1 for phase in columns[5]]
+        columns[6] = [0 if action == "HOLD" else 1 for action in columns[6]]
+        for typecode, column in zip(COLUMN_TYPES, columns):
+            values = array.array(typecode, column)
+            if sys.byteorder != "little":
+                values.byteswap()
+            self.file.write(values.tobytes())
+    
+    def close(self):
+        self.file.close()
+
+
+def read_columnar(path):
+    # yields (algorithm_name, {field: array}) per block
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        rows, name_length = COLUMN_BLOCK_HEADER.unpack_from(data, offset)
+        offset += COLUMN_BLOCK_HEADER.size
+        name = data[offset:offset + name_length].decode()
+        offset += name_length
+        columns = {}
+        for field, typecode in zip(STEP_FIELDS, COLUMN_TYPES):
+            values = array.array(typecode)
+            size = values.itemsize * rows
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder != "little":
+                values.byteswap()
+            columns[field] = values
+            offset += size
+        yield name, columns
+
+
+class BufferedSink:
+    # batches rows and hands full batches to a writer thread, so the
+    # simulation loop never waits on I/O
+    def __init__(self, sink, batch_rows=4096):
+        self.sink = sink
+        self.batch_rows = batch_rows
+        self.rows = []
+        self.queue = queue.Queue(maxsize=64)
+        # set by the writer thread when the wrapped sink fails; the next
+        # write, flush or close raises it in the simulation thread
+        self.error = None
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+    
+    def drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                # keep taking batches so a full queue never blocks put()
+                continue
+            kind, payload = item
+            try:
+                if kind == "start":
+                    self.sink.start(payload)
+                else:
+                    self.sink.write_batch(payload)
+            except Exception as error:
+                self.error = error
+    
+    def check(self):
+        if self.error is not None:
+            raise self.error
+    
+    def start(self, algorithm_name):
+        self.flush()
+        self.queue.put(("start", algorithm_name))
+    
+    def write(self, row):
+        if self.error is not None:
+            raise self.error
+        rows = self.rows
+        rows.append(row)
+        if len(rows) >= self.batch_rows:
+            self.flush()
+    
+    def write_batch(self, rows):
+        for row in rows:
+            self.write(row)
+    
+    def flush(self):
+        self.check()
+        if self.rows:
+            self.queue.put(("rows", self.rows))
+            self.rows = []
+    
+    def close(self):
+        if self.error is None:
+            self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        try:
+            self.check()
+        finally:
+            self.sink.close()
+
+
+# ==================== STREAMING STATISTICS ====================
+
+class RunningStat:
+    # Welford's online mean / variance plus min and max
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+    
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+    
+    def merge(self, other):
+        # Chan et al.'s pairwise combination of two Welford states
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': math.sqrt(self.variance()),
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+
+class LatencyHistogram:
+    # fixed log-spaced buckets, four per power of two nanoseconds, so
+    # percentiles are within ~19% of the true value in constant memory
+    BUCKETS_PER_OCTAVE = 4
+    BUCKET_COUNT = 48 * 4
+    
+    def __init__(self):
+        self.counts = [0] * self.BUCKET_COUNT
+        self.total = 0
+    
+    def add(self, latency_ns):
+        if latency_ns < 1:
+            latency_ns = 1
+        index = int(math.log2(latency_ns) * self.BUCKETS_PER_OCTAVE)
+        if index >= self.BUCKET_COUNT:
+            index = self.BUCKET_COUNT - 1
+        self.counts[index] += 1
+        self.total += 1
+    
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+    
+    def percentile(self, pct):
+        if self.total == 0:
+            return 0
+        rank = max(1, math.ceil(pct / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return 2 ** ((index + 1) / self.BUCKETS_PER_OCTAVE)
+        return 2 ** (self.BUCKET_COUNT / self.BUCKETS_PER_OCTAVE)
+
+
+class SimulationStats:
+    def __init__(self):
+        self.steps = 0
+        self.switches = 0
+        self.waiting = RunningStat()
+        self.lanes = [RunningStat() for _ in range(4)]
+        self.latency = RunningStat()
+        self.histogram = LatencyHistogram()
+    
+    def record(self, state, action, latency_ns):
+        n, s, e, w, phase, tp = state
+        self.steps += 1
+        if action == "SWITCH":
+            self.switches += 1
+        self.waiting.add(n + s + e + w)
+        lanes = self.lanes
+        lanes[0].add(n)
+        lanes[1].add(s)
+        lanes[2].add(e)
+        lanes[3].add(w)
+        self.latency.add(latency_ns)
+        self.histogram.add(latency_ns)
+    
+    def snapshot(self):
+        # bucket upper edges can overshoot the exact maximum
+        top = self.latency.max if self.steps else 0
+        return {
+            'steps': self.steps,
+            'switches': self.switches,
+            'waiting': self.waiting.snapshot(),
+            'lanes': {name: lane.snapshot() for name, lane in zip("NSEW", self.lanes)},
+            'latency_ns': {
+                **self.latency.snapshot(),
+                'p50': min(self.histogram.percentile(50), top),
+                'p95': min(self.histogram.percentile(95), top),
+                'p99': min(self.histogram.percentile(99), top)
+            }
+        }
+
+
+def run_simulation(algorithm_func, algorithm_name, total_time=300, horizon=10, verbose=False, seed=None,
+                   step_budget=None, snapshot_every=None, on_snapshot=None, traffic=None, sinks=None,
+                   min_green_time=3, arrival_range=(0, 2), departure_range=(1, 3), warm_start=False):
+    # every step draws exactly four arrivals and two departures, so runs
+    # with the same seed (or the same TraceReplay as traffic) see the same
+    # traffic whatever the planner does. min_green_time and the ranges
+    # shape the simulated traffic only; planners keep their own model,
+    # which only set_planning_min_green_time changes.
+    if traffic is not None:
+        if isinstance(traffic, (TraceReplay, RecordingRNG)) and (
+                tuple(arrival_range) != TRACE_ARRIVAL_RANGE or tuple(departure_range) != TRACE_DEPARTURE_RANGE):
+            raise ValueError(f"traffic traces only encode arrivals {TRACE_ARRIVAL_RANGE} and "
+                             f"departures {TRACE_DEPARTURE_RANGE}")
+        rng = traffic
+    else:
+        rng = random if seed is None else random.Random(seed)
+    
+    # warm_start carries the last plan from step to step (see WARM_STARTS);
+    # with a per-step budget (seconds) the planner runs in anytime mode
+    if warm_start:
+        algorithm_func = warm_start_planner(algorithm_func)
+    if step_budget is not None:
+        algorithm_func = anytime_planner(algorithm_func, time_budget=step_budget)
+    
+    north = 0
+    south = 0
+    east = 0
+    west = 0
+    phase = "NS"
+    time_in_phase = 0
+    
+    total_waiting = 0  
+    switches = 0  
+    # constant-memory running stats; on_snapshot(sim_stats.snapshot()) is
+    # called every snapshot_every steps so long runs can be watched live
+    sim_stats = SimulationStats()
+    
+    stats = search_stats
+    trace_memory = stats is not None and stats.trace_memory
+    if stats is not None:
+        stats.begin(algorithm_name)
+    # only stop tracing this run started, a caller's tracing keeps going
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    
+    # verbose output is just a console sink next to any caller-supplied ones
+    sinks = list(sinks or ())
+    if verbose:
+        sinks.append(ConsoleSink())
+    for sink in sinks:
+        sink.start(algorithm_name)
+    
+    for t in range(total_time):
+        state = (north, south, east, west, phase, time_in_phase)
+        
+        # peak_bytes is what the search itself allocates on top of the heap
+        # it started from, so memo tables filled by earlier steps do not count
+        if trace_memory:
+            tracemalloc.reset_peak()
+            heap_before = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter_ns()
+        action = algorithm_func(state, horizon)
+        elapsed = time.perf_counter_ns() - start_time
+        if stats is not None:
+            stats.record_step(elapsed, tracemalloc.get_traced_memory()[1] - heap_before if trace_memory else 0)
+        
+        north, south, east, west, phase, time_in_phase = transition_for_simulation(
+            state, action, min_green_time, rng, arrival_range, departure_range)
+        
+        if action == "SWITCH":
+            switches += 1
+        
+        cars_waiting = north + south + east + west
+        total_waiting += cars_waiting
+        sim_stats.record((north, south, east, west, phase, time_in_phase), action, elapsed)
+        if snapshot_every and on_snapshot is not None and (t + 1) % snapshot_every == 0:
+            on_snapshot(sim_stats.snapshot())
+        
+        if sinks:
+            row = (t, north, south, east, west, phase, action, cars_waiting)
+            for sink in sinks:
+                sink.write(row)
+    
+    if started_tracing:
+        tracemalloc.stop()
+    
+    avg_waiting = total_waiting / total_time  
+    avg_step_time = sim_stats.latency.mean / 1e9
+    
+    return {
+        'algorithm': algorithm_name,
+        'total_waiting': total_waiting,
+        'avg_waiting': avg_waiting,
+        'switches': switches,
+        'avg_step_time': avg_step_time,
+        'max_step_time': sim_stats.latency.max / 1e9,
+        'truncated_steps': algorithm_func.truncated if step_budget is not None else 0,
+        'stats': sim_stats.snapshot()
+    }
+
+
+def print_search_stats(stats):
+    print("\n" + "="*100)
+    print("SEARCH STATISTICS (per step)")
+    print("="*100)
+    print(f"{'Algorithm':<12} {'Generated':<11} {'Expanded':<11} {'Dup Hits':<11} {'Peak Front':<11} "
+          f"{'p50(ms)':<9} {'p95(ms)':<9} {'p99(ms)':<9} {'Max(ms)':<9} {'Peak KiB':<9}")
+    print("-"*100)
+    for name, s in stats.summary().items():
+        lat = s['latency_ns']
+        peak_kib = f"{s['peak_bytes'] / 1024:.1f}" if s['peak_bytes'] is not None else "-"
+        print(f"{name:<12} {s['generated_per_step']:<11.1f} {s['expanded_per_step']:<11.1f} "
+              f"{s['duplicates_per_step']:<11.1f} {s['peak_frontier']:<11} "
+              f"{lat['p50']/1e6:<9.3f} {lat['p95']/1e6:<9.3f} {lat['p99']/1e6:<9.3f} {lat['max']/1e6:<9.3f} {peak_kib:<9}")
+
+
+ALGORITHMS = [
+    (a_star, "A*"),
+    (bfs, "BFS"),
+    (dfs, "DFS"),
+    (ucs, "UCS"),
+    (iddfs, "IDDFS"),
+    (dp_plan, "DP"),
+    (bnb_plan, "B&B"),
+    (beam_plan, "Beam")
+]
+
+# the Monte Carlo planner needs NumPy for its rollouts
+if np is not None:
+    ALGORITHMS.append((mc_plan, "MC"))
+
+# packed-state twins of the search planners; find_algorithm knows them,
+# compare_algorithms and the GUI stick to ALGORITHMS
+PACKED_ALGORITHMS = [
+    (a_star_packed, "A*/packed"),
+    (bfs_packed, "BFS/packed"),
+    (dfs_packed, "DFS/packed"),
+    (ucs_packed, "UCS/packed"),
+    (iddfs_packed, "IDDFS/packed")
+]
+
+# answers from the table given to load_policy_table (compile, then
+# simulate --policy-table) and falls back to DP outside it
+TABLE_ALGORITHMS = [
+    (table_policy, "Table")
+]
+
+# Planners whose decision only depends on canonical_state(state). DFS,
+# IDDFS and A* skip raw states they have seen, so capping time_in_phase
+# can change their answer (DFS/IDDFS on about 4% of random states).
+CANONICAL_PLANNERS = {bfs, ucs, dp_plan, bnb_plan, beam_plan, mc_plan, bfs_packed, ucs_packed}
+
+
+def compare_worker(job):
+    global search_stats
+    algo_func, algo_name, total_time, horizon, seed, instrument, trace_path = job
+    traffic = TraceReplay(trace_path) if trace_path is not None else None
+    try:
+        if instrument is None:
+            return run_simulation(algo_func, algo_name, total_time, horizon, seed=seed, traffic=traffic)
+        
+        # each job collects into its own stats and hands the raw bucket back,
+        # so pooled and inline runs merge the same way
+        previous = search_stats
+        stats = search_stats = SearchStats(trace_memory=instrument)
+        try:
+            result = run_simulation(algo_func, algo_name, total_time, horizon, seed=seed, traffic=traffic)
+        finally:
+            search_stats = previous
+        result['search_stats'] = stats.algorithms[algo_name]
+        return result
+    finally:
+        if traffic is not None:
+            traffic.close()
+
+
+def merge_results(runs):
+    count = len(runs)
+    return {
+        'algorithm': runs[0]['algorithm'],
+        'total_waiting': sum(r['total_waiting'] for r in runs) / count,
+        'avg_waiting': sum(r['avg_waiting'] for r in runs) / count,
+        'switches': sum(r['switches'] for r in runs) / count,
+        'avg_step_time': sum(r['avg_step_time'] for r in runs) / count,
+        'runs': count
+    }
+
+
+def compare_algorithms(total_time=300, horizon=10, seeds=None, processes=None, trace_path=None):
+    # a trace fixes the traffic, so several seeds would replay the same run
+    if trace_path is not None and seeds is not None and len(seeds) > 1:
+        raise ValueError("a traffic trace replays the same traffic for every seed; use one run per trace")
+    algorithms = ALGORITHMS
+    
+    print("\n" + "="*80)
+    print("AI-BASED INTELLIGENT TRAFFIC LIGHT CONTROL SYSTEM")
+    print("ALGORITHM COMPARISON")
+    print("="*80)
+    print(f"\nSimulation Parameters:")
+    print(f"  Total Time: {total_time} steps")
+    print(f"  Planning Horizon: {horizon} steps")
+    if trace_path is not None:
+        print(f"  Traffic Trace: {trace_path}")
+    
+    results = []
+    
+    if seeds is None:
+        for algo_func, algo_name in algorithms:
+            print(f"\n{'='*80}")
+            print(f"Running {algo_name}...")
+            print(f"{'='*80}")
+            
+            if trace_path is None:
+                result = run_simulation(algo_func, algo_name, total_time, horizon, verbose=True)
+            else:
+                traffic = TraceReplay(trace_path)
+                try:
+                    result = run_simulation(algo_func, algo_name, total_time, horizon, verbose=True,
+                                            traffic=traffic)
+                finally:
+                    traffic.close()
+            results.append(result)
+    else:
+        # one job per (algorithm, seed); every algorithm gets the same seeds
+        # and pool.map keeps job order, so the merge is deterministic
+        seeds = list(seeds)
+        print(f"  Seeds: {seeds}")
+        stats = search_stats
+        instrument = stats.trace_memory if stats is not None else None
+        jobs = [(algo_func, algo_name, total_time, horizon, seed, instrument, trace_path)
+                for algo_func, algo_name in algorithms for seed in seeds]
+        
+        if processes == 1:
+            runs = [compare_worker(job) for job in jobs]
+        else:
+            with multiprocessing.Pool(processes) as pool:
+                runs = pool.map(compare_worker, jobs)
+        
+        if stats is not None:
+            for run in runs:
+                stats.merge(run['algorithm'], run.pop('search_stats'))
+        
+        for i in range(len(algorithms)):
+            results.append(merge_results(runs[i * len(seeds):(i + 1) * len(seeds)]))
+    
+    print("\n" + "="*80)
+    print("PERFORMANCE COMPARISON")
+    print("="*80)
+    print(f"{'Algorithm':<12} {'Total Wait':<15} {'Avg Wait':<15} {'Switches':<12} {'Avg Time(ms)':<15}")
+    print("-"*80)
+    
+    for r in results:
+        print(f"{r['algorithm']:<12} {r['total_waiting']:<15.0f} {r['avg_waiting']:<15.2f} {r['switches']:<12.0f} {r['avg_step_time']*1000:<15.3f}")
+    
+    best_waiting = min(results, key=lambda x: x['avg_waiting'])  
+    best_speed = min(results, key=lambda x: x['avg_step_time'])  
+    
+    print("\n" + "="*80)
+    print("BEST PERFORMERS")
+    print("="*80)
+    print(f"Best Average Waiting Time: {best_waiting['algorithm']} ({best_waiting['avg_waiting']:.2f} cars)")
+    print(f"Fastest Execution: {best_speed['algorithm']} ({best_speed['avg_step_time']*1000:.3f} ms per step)")
+    
+    stats = dp_cache.stats()
+    if stats['hits'] or stats['misses']:
+        print(f"DP Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions ({stats['size']}/{stats['maxsize']} entries)")
+    
+    if search_stats is not None:
+        print_search_stats(search_stats)
+    print("\n")
+    
+    return best_waiting['algorithm']
+
+
+# ==================== GUI IMPLEMENTATION ====================
+
+class IntersectionView:
+    # one intersection drawn at the 600x450 layout of the main window;
+    # the dashboard shrinks it with scale (fonts are scaled separately
+    # because Canvas.scale only moves coordinates)
+    def __init__(self, canvas, scale=1.0):
+        self.canvas = canvas
+        self.scale = scale
+        self.draw()
+    
+    def draw(self):
+        font_size = max(7, int(18 * self.scale))
         
-    def draw_intersection(self):
         self.canvas.create_rectangle(250, 0, 350, 450, fill="#7f8c8d", outline="")
         self.canvas.create_rectangle(0, 175, 600, 275, fill="#7f8c8d", outline="")
         
@@ -450,22 +2220,30 @@ class TrafficLightGUI:
         
         self.canvas.create_rectangle(270, 60, 330, 95, fill="#2c3e50", outline="white", width=2)
         self.north_text = self.canvas.create_text(300, 77, text="N: 0", 
-                                                 font=("Arial", 18, "bold"), fill="#f39c12")
+                                                 font=("Arial", font_size, "bold"), fill="#f39c12")
         
         self.canvas.create_rectangle(270, 355, 330, 390, fill="#2c3e50", outline="white", width=2)
         self.south_text = self.canvas.create_text(300, 372, text="S: 0", 
-                                                 font=("Arial", 18, "bold"), fill="#f39c12")
+                                                 font=("Arial", font_size, "bold"), fill="#f39c12")
         
         self.canvas.create_rectangle(470, 205, 530, 240, fill="#2c3e50", outline="white", width=2)
         self.east_text = self.canvas.create_text(500, 222, text="E: 0", 
-                                                font=("Arial", 18, "bold"), fill="#f39c12")
+                                                font=("Arial", font_size, "bold"), fill="#f39c12")
         
         self.canvas.create_rectangle(70, 205, 130, 240, fill="#2c3e50", outline="white", width=2)
         self.west_text = self.canvas.create_text(100, 222, text="W: 0", 
-                                                font=("Arial", 18, "bold"), fill="#f39c12")
+                                                font=("Arial", font_size, "bold"), fill="#f39c12")
         
-    def update_lights(self):
-        if self.phase == "NS":
+        if self.scale != 1.0:
+            self.canvas.scale("all", 0, 0, self.scale, self.scale)
+    
+    def update(self, north, south, east, west, phase):
+        self.canvas.itemconfig(self.north_text, text=f"N: {north}")
+        self.canvas.itemconfig(self.south_text, text=f"S: {south}")
+        self.canvas.itemconfig(self.east_text, text=f"E: {east}")
+        self.canvas.itemconfig(self.west_text, text=f"W: {west}")
+        
+        if phase == "NS":
             self.canvas.itemconfig(self.north_light, fill="#2ecc71")
             self.canvas.itemconfig(self.south_light, fill="#2ecc71")
             self.canvas.itemconfig(self.east_light, fill="#e74c3c")
@@ -475,25 +2253,182 @@ class TrafficLightGUI:
             self.canvas.itemconfig(self.south_light, fill="#e74c3c")
             self.canvas.itemconfig(self.east_light, fill="#2ecc71")
             self.canvas.itemconfig(self.west_light, fill="#2ecc71")
+
+
+class TrafficLightGUI:
+    def __init__(self, root, algorithm_func, algorithm_name, total_steps=300, horizon=10, warm_start=False,
+                 step_budget=None):
+        self.root = root
+        self.root.title(f"AI Traffic Light Control System - {algorithm_name}")
+        self.root.geometry("900x700")
+        self.root.resizable(False, False)
+        
+        self.algorithm_func = algorithm_func
+        self.algorithm_name = algorithm_name
+        
+        self.running = False  
+        self.paused = False   
+        self.north = 0        
+        self.south = 0        
+        self.east = 0         
+        self.west = 0         
+        self.phase = "NS"     
+        self.time_in_phase = 0  
+        self.current_step = 0   
+        self.total_steps = total_steps  
+        self.horizon = horizon  
+        self.total_waiting = 0  
+        self.switches = 0       
+        self.delay = 500        
+        self.step_budget = step_budget
+        self.search_depth = None
+        # the warm-started planner of the current run holds its last plan
+        self.warm_start = warm_start
+        self.warm_planner = None
+        self.sinks = [ConsoleSink()]
+        
+        # the sim thread only publishes self.snapshot; render_frame polls it
+        # at up to max_fps and skips the steps it missed
+        self.turbo = False      
+        self.max_fps = 30       
+        self.generation = 0     
+        self.snapshot = self.make_snapshot()
+        self.rendered = None
+        self.frames = 0
+        self.rate_time = time.perf_counter()
+        self.rate_step = 0
+        self.setup_gui()
+        
+        self.root.after(0, self.render_frame)
+        self.root.after(500, self.start_simulation)
+        
+    def setup_gui(self):
+        title_frame = tk.Frame(self.root, bg="#2c3e50", height=60)
+        title_frame.pack(fill=tk.X)  
+        title_label = tk.Label(title_frame, text=f"AI Traffic Light Control - {self.algorithm_name}", 
+                              font=("Arial", 20, "bold"), bg="#2c3e50", fg="white")
+        title_label.pack(pady=15)  
+        
+        self.canvas = tk.Canvas(self.root, width=600, height=450, bg="#34495e")
+        self.canvas.pack(pady=10) 
+        self.draw_intersection()
+        
+        info_frame = tk.Frame(self.root, bg="#ecf0f1")
+        info_frame.pack(fill=tk.X, padx=20, pady=5)
+        
+        left_info = tk.Frame(info_frame, bg="#ecf0f1")
+        left_info.pack(side=tk.LEFT, padx=10)
+        
+        self.step_label = tk.Label(left_info, text=f"Step: 0/{self.total_steps}", 
+                                   font=("Arial", 12, "bold"), bg="#ecf0f1")
+        self.step_label.pack(anchor=tk.W) 
+        
+        self.phase_label = tk.Label(left_info, text="Phase: NS", 
+                                    font=("Arial", 12), bg="#ecf0f1", fg="#27ae60")
+        self.phase_label.pack(anchor=tk.W)
+        
+        self.action_label = tk.Label(left_info, text="Action: HOLD", 
+                                     font=("Arial", 12), bg="#ecf0f1")
+        self.action_label.pack(anchor=tk.W)
+        
+        right_info = tk.Frame(info_frame, bg="#ecf0f1")
+        right_info.pack(side=tk.RIGHT, padx=10)
+        
+        self.total_cars_label = tk.Label(right_info, text="Total Waiting: 0", 
+                                         font=("Arial", 12), bg="#ecf0f1")
+        self.total_cars_label.pack(anchor=tk.E) 
+        
+        self.avg_waiting_label = tk.Label(right_info, text="Avg Waiting: 0.00", 
+                                         font=("Arial", 12), bg="#ecf0f1")
+        self.avg_waiting_label.pack(anchor=tk.E)
+        
+        self.switches_label = tk.Label(right_info, text="Switches: 0", 
+                                      font=("Arial", 12), bg="#ecf0f1")
+        self.switches_label.pack(anchor=tk.E)
+        
+        button_frame = tk.Frame(self.root, bg="#ecf0f1")
+        button_frame.pack(pady=10)
+        
+        self.pause_btn = tk.Button(button_frame, text="Pause", 
+                                   command=self.toggle_pause,  
+                                   font=("Arial", 12, "bold"), bg="#f39c12", 
+                                   fg="white", width=15, height=2)
+        self.pause_btn.pack(side=tk.LEFT, padx=5)
+
+        self.reset_btn = tk.Button(button_frame, text="Reset", 
+                                   command=self.reset_simulation,  
+                                   font=("Arial", 12, "bold"), bg="#e74c3c", 
+                                   fg="white", width=15, height=2)
+        self.reset_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.turbo_btn = tk.Button(button_frame, text="Turbo: Off", 
+                                   command=self.toggle_turbo,  
+                                   font=("Arial", 12, "bold"), bg="#8e44ad", 
+                                   fg="white", width=15, height=2)
+        self.turbo_btn.pack(side=tk.LEFT, padx=5)
+        
+        speed_frame = tk.Frame(self.root, bg="#ecf0f1")
+        speed_frame.pack(pady=5)
+        
+        tk.Label(speed_frame, text="Speed:", font=("Arial", 10), bg="#ecf0f1").pack(side=tk.LEFT, padx=5)
+        
+        self.speed_scale = tk.Scale(speed_frame, from_=100, to=2000, 
+                                    orient=tk.HORIZONTAL, length=200,
+                                    command=self.update_speed, bg="#ecf0f1")  
+        self.speed_scale.set(500) 
+        self.speed_scale.pack(side=tk.LEFT)
+        
+        tk.Label(speed_frame, text="(Lower = Faster)", 
+                font=("Arial", 9, "italic"), bg="#ecf0f1", fg="gray").pack(side=tk.LEFT, padx=5)
+        
+        self.rate_label = tk.Label(self.root, text="Sim: 0 steps/s | Render: 0 FPS", 
+                                   font=("Arial", 9), bg="#ecf0f1", fg="gray")
+        self.rate_label.pack()
+        
+    def draw_intersection(self):
+        self.view = IntersectionView(self.canvas)
+    
+    def make_snapshot(self, action="HOLD"):
+        return (self.current_step, self.north, self.south, self.east, self.west, self.phase,
+                self.time_in_phase, action, self.total_waiting, self.switches, self.search_depth)
     
-    def update_display(self, action="HOLD"):
-        self.canvas.itemconfig(self.north_text, text=f"N: {self.north}")
-        self.canvas.itemconfig(self.south_text, text=f"S: {self.south}")
-        self.canvas.itemconfig(self.east_text, text=f"E: {self.east}")
-        self.canvas.itemconfig(self.west_text, text=f"W: {self.west}")
+    def update_display(self, snapshot):
+        step, north, south, east, west, phase, time_in_phase, action, total_waiting, switches, depth = snapshot
         
-        self.step_label.config(text=f"Step: {self.current_step}/{self.total_steps}")
-        self.phase_label.config(text=f"Phase: {self.phase} (t={self.time_in_phase})")
-        self.action_label.config(text=f"Action: {action}")
+        self.view.update(north, south, east, west, phase)
         
-        cars_waiting = self.north + self.south + self.east + self.west
-        avg_waiting = self.total_waiting / self.current_step if self.current_step > 0 else 0
+        self.step_label.config(text=f"Step: {step}/{self.total_steps}")
+        self.phase_label.config(text=f"Phase: {phase} (t={time_in_phase})")
+        if depth is None:
+            self.action_label.config(text=f"Action: {action}")
+        else:
+            self.action_label.config(text=f"Action: {action} (depth {depth}/{self.horizon})")
+        
+        cars_waiting = north + south + east + west
+        avg_waiting = total_waiting / step if step > 0 else 0
         
         self.total_cars_label.config(text=f"Total Waiting: {cars_waiting}")
         self.avg_waiting_label.config(text=f"Avg Waiting: {avg_waiting:.2f}")
-        self.switches_label.config(text=f"Switches: {self.switches}")
+        self.switches_label.config(text=f"Switches: {switches}")
+    
+    def render_frame(self):
+        snapshot = self.snapshot
+        if snapshot is not self.rendered:
+            self.update_display(snapshot)
+            self.rendered = snapshot
+            self.frames += 1
         
-        self.update_lights()
+        now = time.perf_counter()
+        elapsed = now - self.rate_time
+        if elapsed >= 1.0:
+            step = snapshot[0]
+            steps_per_sec = max(0, step - self.rate_step) / elapsed
+            self.rate_label.config(text=f"Sim: {steps_per_sec:.0f} steps/s | Render: {self.frames / elapsed:.0f} FPS")
+            self.frames = 0
+            self.rate_time = now
+            self.rate_step = step
+        
+        self.root.after(max(1, int(1000 / self.max_fps)), self.render_frame)
     
     def start_simulation(self):
         if not self.running:
@@ -510,9 +2445,14 @@ class TrafficLightGUI:
         else:
             self.pause_btn.config(text="Pause", bg="#f39c12")  
     
+    def toggle_turbo(self):
+        self.turbo = not self.turbo
+        self.turbo_btn.config(text="Turbo: On" if self.turbo else "Turbo: Off")
+    
     def reset_simulation(self):
         self.running = False
         self.paused = False
+        self.generation += 1
         self.north = 0
         self.south = 0
         self.east = 0
@@ -522,8 +2462,10 @@ class TrafficLightGUI:
         self.current_step = 0
         self.total_waiting = 0
         self.switches = 0
+        self.search_depth = None
+        self.warm_planner = None
         
-        self.update_display()
+        self.snapshot = self.make_snapshot()
         self.pause_btn.config(text="Pause", bg="#f39c12")
         
         self.root.after(500, self.start_simulation)
@@ -532,14 +2474,18 @@ class TrafficLightGUI:
         self.delay = int(value)
     
     def run_simulation_loop(self):
-        print("\n" + "="*70)
-        print(f"Algorithm: {self.algorithm_name}")
-        print("="*70)
-        print(f"{'Time':<8} {'N':<6} {'S':<6} {'E':<6} {'W':<6} {'Phase':<8} {'Action':<8} {'Total':<8}")
-        print("-" * 70)
+        generation = self.generation
+        for sink in self.sinks:
+            sink.start(self.algorithm_name)
+        
+        planner = self.algorithm_func
+        if self.warm_start:
+            planner = self.warm_planner = warm_start_planner(self.algorithm_func)
+        if self.step_budget is not None:
+            planner = anytime_planner(planner, time_budget=self.step_budget)
         
         for t in range(self.total_steps):
-            if not self.running:
+            if not self.running or generation != self.generation:
                 break
                 
             while self.paused:
@@ -550,7 +2496,11 @@ class TrafficLightGUI:
             self.current_step = t + 1
             
             state = (self.north, self.south, self.east, self.west, self.phase, self.time_in_phase)
-            action = self.algorithm_func(state, self.horizon)
+            action = planner(state, self.horizon)
+            if generation != self.generation:
+                break
+            if self.step_budget is not None:
+                self.search_depth = planner.last_depth
             
             self.north, self.south, self.east, self.west, self.phase, self.time_in_phase = \
                 transition_for_simulation(state, action)
@@ -561,14 +2511,16 @@ class TrafficLightGUI:
             cars_waiting = self.north + self.south + self.east + self.west
             self.total_waiting += cars_waiting
             
-            if t % 10 == 0:
-                print(f"{t:<8} {self.north:<6} {self.south:<6} {self.east:<6} {self.west:<6} {self.phase:<8} {action:<8} {cars_waiting:<8}")
+            row = (t, self.north, self.south, self.east, self.west, self.phase, action, cars_waiting)
+            for sink in self.sinks:
+                sink.write(row)
             
-            self.root.after(0, lambda a=action: self.update_display(a))
+            self.snapshot = self.make_snapshot(action)
             
-            time.sleep(self.delay / 1000.0)
+            if not self.turbo:
+                time.sleep(self.delay / 1000.0)
         
-        if self.running:
+        if self.running and generation == self.generation:
             avg_waiting = self.total_waiting / self.total_steps if self.total_steps > 0 else 0
             print("\n" + "="*70)
             print("SIMULATION COMPLETE")
@@ -578,20 +2530,21 @@ class TrafficLightGUI:
             print(f"Switches: {self.switches}")
             print("\n")
         
-        self.running = False
+        if generation == self.generation:
+            self.running = False
 
 
-def run_gui_with_best_algorithm():
-    algo_map = {
-        "A*": a_star,
-        "BFS": bfs,
-        "DFS": dfs,
-        "UCS": ucs,
-        "IDDFS": iddfs
-    }
-    
-    print("\nRunning algorithm comparison to find best average waiting time...")
-    best_algo_name = compare_algorithms(total_time=300, horizon=10)
+def run_gui_with_best_algorithm(total_time=300, horizon=10, seed=None, use_cache=True, algorithm_name=None,
+                                warm_start=False, step_budget=None):
+    if algorithm_name is not None:
+        best_algo_name = algorithm_name
+    elif seed is not None and use_cache:
+        print("\nRunning algorithm comparison to find best average waiting time...")
+        best_algo_name = cached_best_algorithm(total_time, horizon, seed)
+    else:
+        print("\nRunning algorithm comparison to find best average waiting time...")
+        best_algo_name = compare_algorithms(total_time=total_time, horizon=horizon,
+                                            seeds=None if seed is None else [seed], processes=1)
     
     print("\n" + "="*80)
     print(f"LAUNCHING GUI WITH BEST ALGORITHM: {best_algo_name}")
@@ -599,19 +2552,1295 @@ def run_gui_with_best_algorithm():
     print("\nGUI will now visualize the simulation in real-time.")
     print("All output will continue to appear in this terminal.\n")
     
-    best_algo_func = algo_map[best_algo_name]
+    best_algo_func = find_algorithm(best_algo_name)[0]
+    if warm_start and best_algo_func not in WARM_STARTS:
+        print(f"{best_algo_name} has no warm start, planning every step from scratch.\n")
+        warm_start = False
     
-    root = tk.Tk()
-    app = TrafficLightGUI(root, best_algo_func, best_algo_name)
+    root = load_tkinter().Tk()
+    app = TrafficLightGUI(root, best_algo_func, best_algo_name, total_steps=total_time, horizon=horizon,
+                          warm_start=warm_start, step_budget=step_budget)
     root.mainloop()
 
 
-if __name__ == "__main__":
+# ==================== DASHBOARD ====================
+
+# The dashboard runs every planner in its own process on the same seeded
+# traffic. Workers publish into one shared memory block of int64 words: a
+# control block (stop, paused, delay_ms, spare), then per planner a header
+# (published steps, done flag) and a ring of DASHBOARD_RING step records.
+# A record is written before the step count is bumped, so the reader only
+# sees whole records unless it falls a full ring behind.
+DASHBOARD_FIELDS = ("step", "north", "south", "east", "west", "phase", "action",
+                    "cars_waiting", "total_waiting", "switches", "latency_ns")
+DASHBOARD_CONTROL = 4
+DASHBOARD_SLOT_HEADER = 2
+DASHBOARD_RING = 4096
+CONTROL_STOP = 0
+CONTROL_PAUSED = 1
+CONTROL_DELAY_MS = 2
+DASHBOARD_COLORS = ("#e74c3c", "#3498db", "#2ecc71", "#f39c12", "#9b59b6",
+                    "#1abc9c", "#e67e22", "#34495e")
+
+
+class DashboardBuffer:
+    def __init__(self, slots, ring=DASHBOARD_RING, name=None):
+        self.slots = slots
+        self.ring = ring
+        self.record_size = len(DASHBOARD_FIELDS)
+        self.slot_size = DASHBOARD_SLOT_HEADER + ring * self.record_size
+        self.size = 8 * (DASHBOARD_CONTROL + slots * self.slot_size)
+        # a new segment is zero-filled: running, not paused, no delay
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast("q")
     
+    def control(self, index):
+        return self.words[index]
     
-  
-    print("\n" + "="*80)
-    print("NOW RUNNING FULL COMPARISON (300 steps, all 5 algorithms)")
-    print("="*80)
+    def set_control(self, index, value):
+        self.words[index] = value
+    
+    def slot_base(self, slot):
+        return DASHBOARD_CONTROL + slot * self.slot_size
+    
+    def publish(self, slot, record):
+        base = self.slot_base(slot)
+        count = self.words[base]
+        offset = base + DASHBOARD_SLOT_HEADER + (count % self.ring) * self.record_size
+        self.words[offset:offset + self.record_size] = array.array("q", record)
+        self.words[base] = count + 1
+    
+    def set_done(self, slot):
+        self.words[self.slot_base(slot) + 1] = 1
+    
+    def read(self, slot, cursor):
+        # -> (records published since cursor, new cursor, done); the oldest
+        # ring entry may be mid-overwrite, so at most ring - 1 come back
+        base = self.slot_base(slot)
+        done = self.words[base + 1]
+        count = self.words[base]
+        start = max(cursor, count - self.ring + 1)
+        records = []
+        for index in range(start, count):
+            offset = base + DASHBOARD_SLOT_HEADER + (index % self.ring) * self.record_size
+            records.append(self.words[offset:offset + self.record_size].tolist())
+        return records, count, done
+    
+    def clear(self):
+        # zero every slot, keeping the control block
+        start = 8 * DASHBOARD_CONTROL
+        self.shm.buf[start:self.size] = bytes(self.size - start)
+    
+    def close(self):
+        self.words.release()
+        self.shm.close()
+    
+    def unlink(self):
+        self.shm.unlink()
+
+
+def dashboard_worker(shm_name, slots, ring, slot, algo_name, total_time, horizon, seed):
+    # same loop as run_simulation; the seeded rng draws the same arrivals
+    # for every planner, so the panels differ only by their decisions
+    buffer = DashboardBuffer(slots, ring, name=shm_name)
+    try:
+        algo_func, algo_name = find_algorithm(algo_name)
+        rng = random.Random(seed)
+        state = (0, 0, 0, 0, "NS", 0)
+        total_waiting = 0
+        switches = 0
+        
+        for t in range(total_time):
+            while buffer.control(CONTROL_PAUSED) and not buffer.control(CONTROL_STOP):
+                time.sleep(0.05)
+            if buffer.control(CONTROL_STOP):
+                break
+            
+            start_time = time.perf_counter_ns()
+            action = algo_func(state, horizon)
+            latency_ns = time.perf_counter_ns() - start_time
+            
+            state = transition_for_simulation(state, action, rng=rng)
+            north, south, east, west, phase, time_in_phase = state
+            if action == "SWITCH":
+                switches += 1
+            cars_waiting = north + south + east + west
+            total_waiting += cars_waiting
+            
+            buffer.publish(slot, (t + 1, north, south, east, west, 0 if phase == "NS" else 1,
+                                  0 if action == "HOLD" else 1, cars_waiting, total_waiting,
+                                  switches, latency_ns))
+            
+            delay_ms = buffer.control(CONTROL_DELAY_MS)
+            if delay_ms > 0:
+                time.sleep(delay_ms / 1000.0)
+    finally:
+        buffer.set_done(slot)
+        buffer.close()
+
+
+class DashboardGUI:
+    # all planners side by side; the Tk thread never plans, it only drains
+    # the shared ring buffer once per frame
+    def __init__(self, root, algorithm_names, total_steps=300, horizon=10, seed=0):
+        self.root = root
+        self.root.title("AI Traffic Light Control System - Dashboard")
+        self.root.resizable(False, False)
+        
+        self.algorithm_names = algorithm_names
+        self.total_steps = total_steps
+        self.horizon = horizon
+        self.seed = seed
+        self.max_fps = 30
+        self.history = 300      
+        self.delay = 100        
+        self.paused = False
+        
+        self.buffer = DashboardBuffer(len(algorithm_names))
+        self.buffer.set_control(CONTROL_DELAY_MS, self.delay)
+        self.workers = []
+        self.frames = 0
+        self.rate_time = time.perf_counter()
+        
+        self.setup_gui()
+        self.start_workers()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(0, self.render_frame)
+    
+    def setup_gui(self):
+        title_frame = tk.Frame(self.root, bg="#2c3e50", height=60)
+        title_frame.pack(fill=tk.X)
+        title_label = tk.Label(title_frame, text=f"AI Traffic Light Control - Dashboard (seed {self.seed})", 
+                              font=("Arial", 20, "bold"), bg="#2c3e50", fg="white")
+        title_label.pack(pady=15)
+        
+        grid = tk.Frame(self.root, bg="#ecf0f1")
+        grid.pack(padx=10, pady=5)
+        
+        self.views = []
+        self.stat_labels = []
+        for index, name in enumerate(self.algorithm_names):
+            panel = tk.Frame(grid, bg="#ecf0f1")
+            panel.grid(row=index // 3, column=index % 3, padx=5, pady=5)
+            tk.Label(panel, text=name, font=("Arial", 12, "bold"), bg="#ecf0f1",
+                     fg=DASHBOARD_COLORS[index % len(DASHBOARD_COLORS)]).pack()
+            canvas = tk.Canvas(panel, width=300, height=225, bg="#34495e", highlightthickness=0)
+            canvas.pack()
+            self.views.append(IntersectionView(canvas, scale=0.5))
+            label = tk.Label(panel, text="Waiting to start", font=("Arial", 9), bg="#ecf0f1", justify=tk.LEFT)
+            label.pack(anchor=tk.W)
+            self.stat_labels.append(label)
+        
+        index = len(self.algorithm_names)
+        charts = tk.Frame(grid, bg="#ecf0f1")
+        charts.grid(row=index // 3, column=index % 3, padx=5, pady=5)
+        self.waiting_chart = tk.Canvas(charts, width=300, height=125, bg="white", highlightthickness=0)
+        self.waiting_chart.pack(pady=2)
+        self.latency_chart = tk.Canvas(charts, width=300, height=125, bg="white", highlightthickness=0)
+        self.latency_chart.pack(pady=2)
+        
+        button_frame = tk.Frame(self.root, bg="#ecf0f1")
+        button_frame.pack(pady=5)
+        
+        self.pause_btn = tk.Button(button_frame, text="Pause", 
+                                   command=self.toggle_pause,  
+                                   font=("Arial", 12, "bold"), bg="#f39c12", 
+                                   fg="white", width=15)
+        self.pause_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.restart_btn = tk.Button(button_frame, text="Restart", 
+                                     command=self.restart,  
+                                     font=("Arial", 12, "bold"), bg="#e74c3c", 
+                                     fg="white", width=15)
+        self.restart_btn.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(button_frame, text="Delay (ms):", font=("Arial", 10), bg="#ecf0f1").pack(side=tk.LEFT, padx=5)
+        self.speed_scale = tk.Scale(button_frame, from_=0, to=1000, 
+                                    orient=tk.HORIZONTAL, length=200,
+                                    command=self.update_speed, bg="#ecf0f1")
+        self.speed_scale.set(self.delay)
+        self.speed_scale.pack(side=tk.LEFT)
+        
+        self.rate_label = tk.Label(self.root, text="Render: 0 FPS", 
+                                   font=("Arial", 9), bg="#ecf0f1", fg="gray")
+        self.rate_label.pack()
+    
+    def start_workers(self):
+        self.cursors = [0] * len(self.algorithm_names)
+        self.waiting = [deque(maxlen=self.history) for _ in self.algorithm_names]
+        self.latency = [deque(maxlen=self.history) for _ in self.algorithm_names]
+        self.histograms = [LatencyHistogram() for _ in self.algorithm_names]
+        
+        self.buffer.set_control(CONTROL_STOP, 0)
+        self.workers = []
+        for slot, name in enumerate(self.algorithm_names):
+            worker = multiprocessing.Process(
+                target=dashboard_worker,
+                args=(self.buffer.name, self.buffer.slots, self.buffer.ring, slot, name,
+                      self.total_steps, self.horizon, self.seed),
+                daemon=True)
+            worker.start()
+            self.workers.append(worker)
+    
+    def stop_workers(self):
+        self.buffer.set_control(CONTROL_STOP, 1)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self.workers = []
+    
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self.buffer.set_control(CONTROL_PAUSED, int(self.paused))
+        self.pause_btn.config(text="Resume" if self.paused else "Pause")
+    
+    def restart(self):
+        self.stop_workers()
+        self.buffer.clear()
+        self.start_workers()
+    
+    def update_speed(self, value):
+        self.delay = int(float(value))
+        self.buffer.set_control(CONTROL_DELAY_MS, self.delay)
+    
+    def close(self):
+        self.stop_workers()
+        self.buffer.close()
+        self.buffer.unlink()
+        self.root.destroy()
+    
+    def render_frame(self):
+        changed = False
+        for slot, name in enumerate(self.algorithm_names):
+            records, self.cursors[slot], done = self.buffer.read(slot, self.cursors[slot])
+            if not records:
+                continue
+            changed = True
+            for record in records:
+                self.waiting[slot].append(record[7])
+                self.latency[slot].append(record[10] / 1e6)
+                self.histograms[slot].add(record[10])
+            
+            step, north, south, east, west, phase, action, cars_waiting, total_waiting, switches, _ = records[-1]
+            self.views[slot].update(north, south, east, west, "NS" if phase == 0 else "EW")
+            status = "done" if done else ACTIONS[action]
+            p95 = self.histograms[slot].percentile(95) / 1e6
+            self.stat_labels[slot].config(
+                text=f"Step {step}/{self.total_steps} | {status}\n"
+                     f"Avg waiting {total_waiting / step:.2f} | Switches {switches}\n"
+                     f"Plan p95 {p95:.2f} ms")
+        
+        if changed:
+            self.frames += 1
+            self.draw_chart(self.waiting_chart, self.waiting, "Cars waiting", "")
+            self.draw_chart(self.latency_chart, self.latency, "Plan latency", " ms")
+        
+        now = time.perf_counter()
+        elapsed = now - self.rate_time
+        if elapsed >= 1.0:
+            self.rate_label.config(text=f"Render: {self.frames / elapsed:.0f} FPS")
+            self.frames = 0
+            self.rate_time = now
+        
+        self.root.after(max(1, int(1000 / self.max_fps)), self.render_frame)
+    
+    def draw_chart(self, canvas, series, title, unit):
+        canvas.delete("chart")
+        width = int(canvas["width"])
+        height = int(canvas["height"])
+        top = max((max(values) for values in series if values), default=0) or 1
+        x_step = (width - 10) / (self.history - 1)
+        
+        for index, values in enumerate(series):
+            if len(values) < 2:
+                continue
+            coords = []
+            for i, value in enumerate(values):
+                coords.append(5 + i * x_step)
+                coords.append(height - 5 - (height - 25) * value / top)
+            canvas.create_line(*coords, fill=DASHBOARD_COLORS[index % len(DASHBOARD_COLORS)], tags="chart")
+        
+        canvas.create_text(5, 5, anchor=tk.NW, text=f"{title} (max {top:.2f}{unit})", 
+                           font=("Arial", 9), tags="chart")
+
+
+def run_dashboard(total_time=300, horizon=10, seed=0, algorithm_names=None):
+    if algorithm_names is None:
+        algorithm_names = ["A*", "BFS", "DFS", "UCS", "IDDFS"]
+    # resolve names here so a typo fails before any worker starts
+    algorithm_names = [find_algorithm(name)[1] for name in algorithm_names]
+    
+    root = load_tkinter().Tk()
+    app = DashboardGUI(root, algorithm_names, total_steps=total_time, horizon=horizon, seed=seed)
+    root.mainloop()
+
+
+# ==================== CONTROLLER SERVICE ====================
+
+# Roadside units talk newline-delimited JSON over a local TCP or Unix
+# socket. A request carries the state in the usual tuple layout,
+#   {"id": 7, "state": [12, 9, 3, 4, "NS", 2], "deadline_ms": 50}
+# and gets back
+#   {"id": 7, "action": "SWITCH", "fallback": false}
+# Replies can come back out of order on a pipelined connection, so the id
+# is echoed. A request not answered within its deadline gets HOLD with
+# "fallback": true, which keeps the current phase and is always safe.
+
+def parse_state(value):
+    if not isinstance(value, list) or len(value) != 6:
+        raise ValueError("state must be [north, south, east, west, phase, time_in_phase]")
+    n, s, e, w, phase, tp = value
+    if phase not in ("NS", "EW"):
+        raise ValueError("phase must be NS or EW")
+    lanes = (n, s, e, w, tp)
+    if not all(isinstance(x, int) and not isinstance(x, bool) and x >= 0 for x in lanes):
+        raise ValueError("lane counts and time_in_phase must be non-negative integers")
+    return (n, s, e, w, phase, tp)
+
+
+def plan_batch_job(job):
+    # runs in a pool worker, whose own plan_cache persists across batches
+    algo_name, states, horizon = job
+    return plan_batch(states, horizon, algo_name)
+
+
+class ControllerService:
+    def __init__(self, algorithm="A*", horizon=10, processes=None, batch_window_ms=2.0,
+                 max_batch=256, deadline_ms=100.0):
+        self.algo_func, self.algo_name = find_algorithm(algorithm)
+        self.horizon = horizon
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.deadline = deadline_ms / 1000.0
+        self.cache = LRUCache(maxsize=plan_cache.maxsize)
+        
+        self.requests = 0
+        self.batches = 0
+        self.batched = 0
+        self.fallbacks = 0
+        self.errors = 0
+    
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        self.pending = asyncio.Queue()
+        # at most one batch per worker in flight; the rest keep queueing
+        # and so form larger batches
+        self.slots = asyncio.Semaphore(self.processes)
+        # the event loop only holds tasks weakly, so running batches are
+        # kept here until they finish
+        self.batch_tasks = set()
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.processes)
+        batcher = asyncio.create_task(self.batch_loop())
+        # stop on SIGTERM as well as Ctrl-C, so the service can be supervised
+        if sys.platform != "win32":
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+            where = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            where = f"{host}:{port}"
+        print(f"Serving {self.algo_name} (horizon {self.horizon}) on {where} "
+              f"with {self.processes} worker process(es)")
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            for task in self.batch_tasks:
+                task.cancel()
+            self.executor.shutdown(cancel_futures=True)
+    
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self.answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # the service is shutting down with this unit still connected
+            pass
+        finally:
+            writer.close()
+    
+    async def answer(self, line, writer):
+        received = time.perf_counter()
+        request_id = None
+        try:
+            message = json.loads(line)
+            request_id = message.get("id")
+            state = parse_state(message.get("state"))
+            deadline = message.get("deadline_ms")
+            deadline = self.deadline if deadline is None else deadline / 1000.0
+        except (ValueError, TypeError, AttributeError) as error:
+            self.errors += 1
+            writer.write((json.dumps({"id": request_id, "error": str(error)}) + "\n").encode())
+            return
+        
+        self.requests += 1
+        # cached decisions skip the batch window entirely
+        action = self.cache.get((self.horizon, decision_key(self.algo_func, state)))
+        if action is not None:
+            writer.write((json.dumps({"id": request_id, "action": action, "fallback": False}) + "\n").encode())
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        await self.pending.put((state, future, received + deadline))
+        
+        remaining = received + deadline - time.perf_counter()
+        try:
+            action = await asyncio.wait_for(future, max(0.0, remaining))
+            fallback = False
+        except asyncio.TimeoutError:
+            action = "HOLD"
+            fallback = True
+            self.fallbacks += 1
+        
+        writer.write((json.dumps({"id": request_id, "action": action, "fallback": fallback}) + "\n").encode())
+    
+    async def batch_loop(self):
+        while True:
+            batch = [await self.pending.get()]
+            window_end = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = window_end - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.pending.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self.slots.acquire()
+            task = asyncio.create_task(self.run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+    
+    async def run_batch(self, batch):
+        try:
+            # expired or timed-out requests have already been answered
+            now = time.perf_counter()
+            batch = [item for item in batch if not item[1].done() and item[2] > now]
+            if not batch:
+                return
+            
+            # same keys as plan_batch, so each unit gets the decision for
+            # the state it sent
+            keys = [(self.horizon, decision_key(self.algo_func, state)) for state, _, _ in batch]
+            missing = {}
+            for key, (state, _, _) in zip(keys, batch):
+                if key not in missing and self.cache.get(key) is None:
+                    missing[key] = state
+            
+            if missing:
+                self.batches += 1
+                self.batched += len(missing)
+                loop = asyncio.get_running_loop()
+                actions = await loop.run_in_executor(
+                    self.executor, plan_batch_job, (self.algo_name, list(missing.values()), self.horizon))
+                for key, action in zip(missing, actions):
+                    self.cache.put(key, action)
+            
+            for key, (_, future, _) in zip(keys, batch):
+                if not future.done():
+                    future.set_result(self.cache.data.get(key, "HOLD"))
+        finally:
+            self.slots.release()
+    
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'avg_batch': self.batched / self.batches if self.batches else 0.0,
+            'fallbacks': self.fallbacks,
+            'errors': self.errors,
+            'cache': self.cache.stats()
+        }
+
+
+async def load_generator(host="127.0.0.1", port=8765, unix_path=None, clients=50, requests=200,
+                         deadline_ms=100.0, seed=0):
+    # each client is one intersection on its own connection, sending its
+    # state, applying the decision and sending the next state (closed loop)
+    latency = LatencyHistogram()
+    worst = 0
+    fallbacks = 0
+    
+    async def client(index):
+        nonlocal worst, fallbacks
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        rng = random.Random(seed * 100003 + index)
+        state = (0, 0, 0, 0, "NS", 0)
+        try:
+            for request_id in range(requests):
+                start_time = time.perf_counter_ns()
+                message = {"id": request_id, "state": list(state), "deadline_ms": deadline_ms}
+                writer.write((json.dumps(message) + "\n").encode())
+                reply = json.loads(await reader.readline())
+                elapsed = time.perf_counter_ns() - start_time
+                latency.add(elapsed)
+                worst = max(worst, elapsed)
+                fallbacks += reply["fallback"]
+                state = transition_for_simulation(state, reply["action"], rng=rng)
+        finally:
+            writer.close()
+    
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    elapsed = time.perf_counter() - start_time
+    
+    total = clients * requests
+    return {
+        'requests': total,
+        'throughput': total / elapsed,
+        'p50_ms': latency.percentile(50) / 1e6,
+        'p95_ms': latency.percentile(95) / 1e6,
+        'p99_ms': latency.percentile(99) / 1e6,
+        'max_ms': worst / 1e6,
+        'fallbacks': fallbacks
+    }
+
+
+# ==================== BENCHMARKS ====================
+
+# fixed start states per queue regime, so every planner and every run of
+# the suite times exactly the same decisions
+BENCHMARK_REGIMES = {
+    'empty': [(0, 0, 0, 0, "NS", 0), (0, 0, 0, 0, "EW", 3), (1, 0, 0, 1, "NS", 5)],
+    'balanced': [(10, 8, 9, 11, "NS", 0), (12, 10, 11, 9, "EW", 2), (8, 9, 10, 8, "NS", 4)],
+    'saturated': [(60, 55, 58, 62, "NS", 1), (45, 70, 66, 50, "EW", 5), (80, 75, 20, 25, "EW", 0)]
+}
+BENCHMARK_ALGORITHMS = ("BFS", "DFS", "UCS", "A*", "IDDFS")
+
+
+def time_best(func, repeat, setup=None):
+    # best of repeat wall times in ns; the minimum is the least noisy
+    # estimate. setup runs untimed before every repeat.
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start_time = time.perf_counter_ns()
+        func()
+        best = min(best, time.perf_counter_ns() - start_time)
+    return best
+
+
+def hold_planner(state, horizon, budget=None):
+    return "HOLD"
+
+
+def benchmark_suite(algorithms=BENCHMARK_ALGORITHMS, horizons=(4, 8, 12, 16, 20), regimes=None,
+                    repeat=5, sim_steps=300, sim_horizon=10, cell_limit=2.0):
+    # -> {metric: ns per decision, call or step}, lower is better. Once a
+    # single decision takes longer than cell_limit seconds, the larger
+    # horizons for that planner and regime are recorded as None (skipped).
+    # Memoizing planners start every repeat from an empty cache.
+    regimes = list(BENCHMARK_REGIMES) if regimes is None else regimes
+    results = {}
+    
+    def clear_caches():
+        dp_cache.clear()
+        plan_cache.clear()
+    
+    for name in algorithms:
+        algo_func, algo_name = find_algorithm(name)
+        for regime in regimes:
+            states = BENCHMARK_REGIMES[regime]
+            skipping = False
+            for horizon in horizons:
+                metric = f"plan/{algo_name}/{regime}/h{horizon}"
+                if skipping:
+                    results[metric] = None
+                    continue
+                
+                def decide():
+                    for state in states:
+                        algo_func(state, horizon)
+                per_decision = time_best(decide, repeat, setup=clear_caches) / len(states)
+                results[metric] = per_decision
+                skipping = per_decision > cell_limit * 1e9
+    
+    calls = 10000
+    states = [state for regime in BENCHMARK_REGIMES.values() for state in regime]
+    
+    def simulate_transitions():
+        rng = random.Random(0)
+        for i in range(calls):
+            transition_for_simulation(states[i % len(states)], ACTIONS[i & 1], rng=rng)
+    
+    def planning_transitions():
+        for i in range(calls):
+            transition_for_planning(states[i % len(states)], ACTIONS[i & 1])
+    
+    results["transition/simulation"] = time_best(simulate_transitions, repeat) / calls
+    results["transition/planning"] = time_best(planning_transitions, repeat) / calls
+    
+    # the full loop with a free planner is the simulator's own overhead
+    def simulate(algo_func, algo_name):
+        return lambda: run_simulation(algo_func, algo_name, sim_steps, sim_horizon, seed=0)
+    results["simulation/loop"] = time_best(simulate(hold_planner, "HOLD"), repeat) / sim_steps
+    for name in algorithms:
+        algo_func, algo_name = find_algorithm(name)
+        results[f"simulation/{algo_name}/h{sim_horizon}"] = \
+            time_best(simulate(algo_func, algo_name), repeat, setup=clear_caches) / sim_steps
+    
+    return results
+
+
+def save_benchmark(path, results, config):
+    with open(path, "w") as f:
+        json.dump({
+            'code_version': code_version(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'config': config,
+            'results': results
+        }, f, indent=2)
+
+
+def load_benchmark(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_benchmarks(results, baseline, threshold=0.10):
+    # -> [(metric, baseline ns, current ns, ratio, regressed)] for every
+    # metric measured in both runs; regressed means slower by > threshold
+    rows = []
+    for metric, current in results.items():
+        previous = baseline.get(metric)
+        if current is None or previous is None:
+            continue
+        ratio = current / previous if previous > 0 else float('inf')
+        rows.append((metric, previous, current, ratio, ratio > 1 + threshold))
+    return rows
+
+
+# ==================== REGRESSION CHECK ====================
+
+# Decisions of the original list-based planners on 640 random states
+# (horizons 1-11, H = HOLD, S = SWITCH) and their seeded run totals. The
+# rewritten planners and their packed twins promise the same answers;
+# verify checks they still do.
+PLANNER_REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planner_reference.json")
+
+
+def verify_planners(path=PLANNER_REFERENCE):
+    # -> [(algo_name, decisions checked, decisions differing, runs checked,
+    # runs differing)] for every planner in the reference file and its
+    # packed twin, which is held to the same reference
+    with open(path) as f:
+        reference = json.load(f)
+    if planning_min_green_time() != reference['min_green_time']:
+        raise ValueError(f"{path} was recorded with min_green_time={reference['min_green_time']}, "
+                         f"planners use {planning_min_green_time()}")
+    states = [(tuple(row[:6]), row[6]) for row in reference['states']]
+    
+    checks = [(name, reference_name, expected) for reference_name, expected in reference['decisions'].items()
+              for name in (reference_name, reference_name + "/packed")]
+    
+    rows = []
+    for algo_name, reference_name, expected in checks:
+        algo_func = find_algorithm(algo_name)[0]
+        runs = [run for run in reference['runs'] if run[0] == reference_name]
+        decisions_differing = sum(algo_func(state, horizon)[0] != action
+                                  for (state, horizon), action in zip(states, expected))
+        runs_differing = 0
+        for _, seed, total_waiting, switches in runs:
+            result = run_simulation(algo_func, algo_name, reference['total_time'], reference['horizon'], seed=seed)
+            runs_differing += (result['total_waiting'], result['switches']) != (total_waiting, switches)
+        rows.append((algo_name, len(states), decisions_differing, len(runs), runs_differing))
+    return rows
+
+
+# ==================== PARAMETER SWEEPS ====================
+
+# A sweep runs every (algorithm, parameter combination, seed) cell once and
+# keeps the result in SQLite under a hash of the cell and the code version,
+# so rerunning a sweep, or resuming an interrupted one, only pays for new
+# cells. Parameters not in the grid keep these values.
+SWEEP_DEFAULTS = {
+    'total_time': 300,
+    'horizon': 10,
+    'min_green_time': 3,
+    'arrival_range': (0, 2),
+    'departure_range': (1, 3)
+}
+
+SWEEP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    algorithm TEXT NOT NULL,
+    params TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    code_version TEXT NOT NULL,
+    total_waiting INTEGER NOT NULL,
+    avg_waiting REAL NOT NULL,
+    switches INTEGER NOT NULL,
+    avg_step_time REAL NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+
+def sweep_cells(algorithms, grid, seeds):
+    # grid maps parameter name -> list of values; yields (name, params, seed)
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown sweep parameters: {', '.join(sorted(unknown))}")
+    names = sorted(grid)
+    for algorithm in algorithms:
+        algo_name = find_algorithm(algorithm)[1]
+        for values in itertools.product(*(grid[name] for name in names)):
+            params = dict(SWEEP_DEFAULTS)
+            params.update(zip(names, values))
+            for seed in seeds:
+                yield algo_name, params, seed
+
+
+def sweep_key(algo_name, params, seed, version):
+    # tuples and lists encode the same, so the key only depends on values
+    payload = json.dumps([algo_name, params, seed, version], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def planning_min_green_time():
+    return TUPLE_MODEL.min_green_time
+
+
+def set_planning_min_green_time(min_green_time):
+    # planners read min_green_time from TUPLE_MODEL / PACKED_MODEL once per
+    # search. Memoized decisions were made under the old value and are
+    # dropped.
+    if TUPLE_MODEL.min_green_time == min_green_time:
+        return
+    TUPLE_MODEL.min_green_time = min_green_time
+    PACKED_MODEL.min_green_time = min_green_time
+    dp_cache.clear()
+    plan_cache.clear()
+
+
+def sweep_worker(job):
+    key, algo_name, params, seed = job
+    algo_func = find_algorithm(algo_name)[0]
+    # planners and simulation share min_green_time within a cell; the
+    # planning model is put back afterwards because inline sweeps run in
+    # the caller's process
+    previous = planning_min_green_time()
+    set_planning_min_green_time(params['min_green_time'])
+    try:
+        result = run_simulation(algo_func, algo_name, params['total_time'], params['horizon'], seed=seed,
+                                min_green_time=params['min_green_time'],
+                                arrival_range=tuple(params['arrival_range']),
+                                departure_range=tuple(params['departure_range']))
+    finally:
+        set_planning_min_green_time(previous)
+    return key, result
+
+
+def run_sweep(db_path, algorithms, grid, seeds, processes=None, commit_every=50):
+    # -> (cells computed now, cells already in the database)
+    version = code_version()
+    db = sqlite3.connect(db_path)
+    try:
+        db.execute(SWEEP_SCHEMA)
+        done = {row[0] for row in db.execute("SELECT key FROM results WHERE code_version = ?", (version,))}
+        
+        cells = {}
+        for algo_name, params, seed in sweep_cells(algorithms, grid, seeds):
+            key = sweep_key(algo_name, params, seed, version)
+            cells[key] = (algo_name, params, seed)
+        jobs = [(key, *cell) for key, cell in cells.items() if key not in done]
+        skipped = len(cells) - len(jobs)
+        print(f"Sweep: {len(cells)} cells, {skipped} already computed, {len(jobs)} to run")
+        
+        if processes == 1 or len(jobs) <= 1:
+            results = map(sweep_worker, jobs)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(processes)
+            results = pool.imap_unordered(sweep_worker, jobs)
+        
+        # every result is inserted as it arrives; an interrupted sweep only
+        # loses the cells still in flight and the last uncommitted batch
+        computed = 0
+        try:
+            for key, result in results:
+                algo_name, params, seed = cells[key]
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (key, algo_name, json.dumps(params, sort_keys=True), seed, version,
+                            result['total_waiting'], result['avg_waiting'], result['switches'],
+                            result['avg_step_time'], time.time()))
+                computed += 1
+                if computed % commit_every == 0:
+                    db.commit()
+                    print(f"  {computed}/{len(jobs)} cells")
+        finally:
+            db.commit()
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return computed, skipped
+    finally:
+        db.close()
+
+
+def sweep_summary(db_path, limit=20):
+    # per (algorithm, params), averaged over seeds, best first; only rows
+    # from the current code version count
+    db = sqlite3.connect(db_path)
+    try:
+        return db.execute(
+            "SELECT algorithm, params, COUNT(*), AVG(avg_waiting), AVG(switches), AVG(avg_step_time) "
+            "FROM results WHERE code_version = ? GROUP BY algorithm, params "
+            "ORDER BY AVG(avg_waiting) LIMIT ?", (code_version(), limit)).fetchall()
+    finally:
+        db.close()
+
+
+# ==================== COMMAND LINE ====================
+
+BEST_ALGORITHM_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "traffic-light", "best_algorithm.json")
+
+
+def find_algorithm(name):
+    # accepts the display name ("A*") or the function name ("a_star"),
+    # case-insensitively
+    wanted = name.lower()
+    for algo_func, algo_name in ALGORITHMS + PACKED_ALGORITHMS + TABLE_ALGORITHMS:
+        if wanted in (algo_name.lower(), algo_func.__name__.lower()):
+            return algo_func, algo_name
+    choices = ", ".join(algo_name for _, algo_name in ALGORITHMS + PACKED_ALGORITHMS + TABLE_ALGORITHMS)
+    raise SystemExit(f"unknown algorithm {name!r} (choose from {choices})")
+
+
+def code_version():
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def cached_best_algorithm(total_time, horizon, seed, cache_path=BEST_ALGORITHM_CACHE):
+    # the comparison is deterministic for a seed, so its winner is cached
+    # per (total_time, horizon, seed, code version)
+    key = f"{total_time}:{horizon}:{seed}:{code_version()}"
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
     
-    run_gui_with_best_algorithm()
\ No newline at end of file
+    if key in cache:
+        print(f"\nUsing cached comparison result: {cache[key]} ({cache_path})")
+        return cache[key]
+    
+    best_algo_name = compare_algorithms(total_time=total_time, horizon=horizon, seeds=[seed], processes=1)
+    cache[key] = best_algo_name
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    return best_algo_name
+
+
+def open_sink(path):
+    if path.endswith(".csv"):
+        return BufferedSink(CsvSink(path))
+    if path.endswith(".jsonl"):
+        return BufferedSink(JsonLinesSink(path))
+    return BufferedSink(ColumnarSink(path))
+
+
+def command_simulate(args):
+    algo_func, algo_name = find_algorithm(args.algorithm)
+    if args.warm_start and algo_func not in WARM_STARTS:
+        raise SystemExit(f"{algo_name} has no warm start")
+    if args.policy_table:
+        load_policy_table(args.policy_table)
+    elif algo_func is table_policy:
+        raise SystemExit("the Table planner needs --policy-table (see the compile command)")
+    pool = None
+    if algo_func is mc_plan:
+        if args.processes != 1:
+            pool = multiprocessing.Pool(args.processes)
+        algo_func = monte_carlo_planner(args.rollouts, args.decision_budget, pool)
+    sinks = [open_sink(args.log)] if args.log else []
+    traffic = TraceReplay(args.trace) if args.trace else None
+    try:
+        result = run_simulation(algo_func, algo_name, args.steps, args.horizon, verbose=not args.quiet,
+                                seed=args.seed, step_budget=args.step_budget, traffic=traffic, sinks=sinks,
+                                warm_start=args.warm_start)
+    finally:
+        for sink in sinks:
+            sink.close()
+        if traffic is not None:
+            traffic.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+    
+    print(f"\nAlgorithm: {result['algorithm']}")
+    print(f"Total Waiting: {result['total_waiting']} cars")
+    print(f"Average Waiting: {result['avg_waiting']:.2f} cars")
+    print(f"Switches: {result['switches']}")
+    print(f"Avg Time: {result['avg_step_time']*1000:.3f} ms per step")
+
+
+def command_compare(args):
+    if args.trace and args.runs > 1:
+        raise SystemExit("--trace replays the same traffic for every seed, so --runs must be 0 or 1")
+    stats = enable_instrumentation(trace_memory=args.trace_memory) if args.stats or args.stats_json else None
+    seeds = list(range(args.seed, args.seed + args.runs)) if args.runs else None
+    compare_algorithms(args.steps, args.horizon, seeds=seeds, processes=args.processes, trace_path=args.trace)
+    if stats is not None:
+        disable_instrumentation()
+        if args.stats_json:
+            stats.to_json(args.stats_json)
+
+
+def command_gui(args):
+    if args.algorithm:
+        algo_func, algo_name = find_algorithm(args.algorithm)
+    else:
+        algo_name = None
+    run_gui_with_best_algorithm(total_time=args.steps, horizon=args.horizon, seed=args.seed,
+                                use_cache=not args.no_cache, algorithm_name=algo_name,
+                                warm_start=args.warm_start, step_budget=args.step_budget)
+
+
+def command_dashboard(args):
+    names = args.algorithms.split(",") if args.algorithms else None
+    run_dashboard(total_time=args.steps, horizon=args.horizon, seed=args.seed, algorithm_names=names)
+
+
+def command_record(args):
+    steps = record_trace(args.output, args.steps, seed=args.seed)
+    print(f"Recorded {steps} steps of traffic into {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.1f} KiB)")
+
+
+def command_compile(args):
+    algo_func, algo_name = find_algorithm(args.algorithm)
+    set_planning_min_green_time(args.min_green)
+    start_time = time.perf_counter()
+    try:
+        entries = compile_policy(args.output, args.horizon, args.max_queue, args.min_green,
+                                 planner=algo_func, processes=args.processes)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    elapsed = time.perf_counter() - start_time
+    print(f"Compiled {entries} {algo_name} decisions (horizon {args.horizon}, queues 0-{args.max_queue}, "
+          f"min green {args.min_green}) into {args.output}: "
+          f"{os.path.getsize(args.output) / 1024:.1f} KiB in {elapsed:.1f} s")
+
+
+def command_network(args):
+    algo_func, algo_name = find_algorithm(args.algorithm)
+    network = TrafficNetwork.grid(args.rows, args.cols, delay=args.delay)
+    if args.policy_table:
+        policy = table_batch_policy(load_policy_table(args.policy_table), fallback=algo_func)
+    else:
+        policy = scalar_batch_policy(algo_func)
+    result = run_network_simulation(network, policy, algo_name, args.steps, args.horizon, seed=args.seed)
+    
+    print(f"\nNetwork: {args.rows}x{args.cols} grid ({result['nodes']} intersections), link delay {args.delay}")
+    print(f"Algorithm: {result['algorithm']}")
+    print(f"Average Waiting: {result['avg_waiting']:.2f} cars per intersection")
+    print(f"Switches: {int(result['switches'].sum())}")
+    print(f"Cars through: {result['exited']} (in transit: {result['in_transit']})")
+    print(f"Step Time: {result['avg_step_time']*1000:.3f} ms "
+          f"(planning {result['avg_policy_time']*1000:.3f} ms), {result['realtime_factor']:.1f}x real time")
+
+
+def command_batch(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rows = benchmark_plan_batch(args.algorithm, args.horizon, sizes, ticks=args.ticks,
+                                seed=args.seed, processes=args.processes)
+    
+    print(f"\nAlgorithm: {rows[0]['algorithm']}, horizon {args.horizon}, {args.ticks} ticks")
+    print(f"{'Batch':<10} {'Decisions/s':<14} {'Unique':<10} {'Cache hits':<10}")
+    print("-" * 46)
+    for row in rows:
+        print(f"{row['batch_size']:<10} {row['decisions_per_sec']:<14.0f} "
+              f"{row['unique_fraction']:<10.1%} {row['hit_rate']:<10.1%}")
+
+
+def command_serve(args):
+    service = ControllerService(args.algorithm, args.horizon, processes=args.processes,
+                                batch_window_ms=args.batch_window_ms, max_batch=args.max_batch,
+                                deadline_ms=args.deadline_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port, unix_path=args.unix))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    summary = service.summary()
+    print(f"\nRequests: {summary['requests']} in {summary['batches']} batches "
+          f"(avg {summary['avg_batch']:.1f} planned per batch)")
+    print(f"Deadline fallbacks: {summary['fallbacks']}, bad requests: {summary['errors']}")
+
+
+def command_loadgen(args):
+    result = asyncio.run(load_generator(args.host, args.port, unix_path=args.unix, clients=args.clients,
+                                        requests=args.requests, deadline_ms=args.deadline_ms,
+                                        seed=args.seed))
+    print(f"\nRequests: {result['requests']} ({result['fallbacks']} HOLD fallbacks)")
+    print(f"Throughput: {result['throughput']:.0f} decisions/s")
+    print(f"Latency: p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+
+
+def parse_range(text):
+    low, high = (int(x) for x in text.split("-"))
+    return (low, high)
+
+
+def command_sweep(args):
+    grid = {}
+    if args.horizons:
+        grid['horizon'] = [int(h) for h in args.horizons.split(",")]
+    if args.min_green:
+        grid['min_green_time'] = [int(m) for m in args.min_green.split(",")]
+    if args.arrivals:
+        grid['arrival_range'] = [parse_range(r) for r in args.arrivals.split(",")]
+    if args.departures:
+        grid['departure_range'] = [parse_range(r) for r in args.departures.split(",")]
+    grid['total_time'] = [args.steps]
+    algorithms = args.algorithms.split(",") if args.algorithms else [algo_name for _, algo_name in ALGORITHMS]
+    seeds = list(range(args.seed, args.seed + args.seeds))
+    
+    try:
+        computed, skipped = run_sweep(args.db, algorithms, grid, seeds, processes=args.processes)
+    except KeyboardInterrupt:
+        raise SystemExit(f"\nSweep interrupted; finished cells are saved in {args.db}, rerun to resume")
+    print(f"Computed {computed} new cells, reused {skipped} from {args.db}")
+    
+    print(f"\n{'Algorithm':<10} {'Runs':<6} {'Avg Waiting':<12} {'Switches':<10} {'Avg Time(ms)':<13} Parameters")
+    print("-" * 100)
+    for algo_name, params, runs, avg_waiting, switches, step_time in sweep_summary(args.db, args.top):
+        shown = {name: value for name, value in json.loads(params).items() if name in grid}
+        print(f"{algo_name:<10} {runs:<6} {avg_waiting:<12.2f} {switches:<10.1f} {step_time*1000:<13.3f} {shown}")
+
+
+def command_bench(args):
+    algorithms = args.algorithms.split(",") if args.algorithms else BENCHMARK_ALGORITHMS
+    horizons = [int(h) for h in args.horizons.split(",")]
+    regimes = args.regimes.split(",")
+    for regime in regimes:
+        if regime not in BENCHMARK_REGIMES:
+            raise SystemExit(f"unknown regime {regime!r} (choose from {', '.join(BENCHMARK_REGIMES)})")
+    
+    config = {'algorithms': list(algorithms), 'horizons': horizons, 'regimes': regimes,
+              'repeat': args.repeat, 'sim_steps': args.sim_steps, 'cell_limit': args.cell_limit}
+    # the baseline is read before anything is saved, so --save and
+    # --compare can name the same file (a rolling baseline)
+    baseline = load_benchmark(args.compare) if args.compare else None
+    results = benchmark_suite(algorithms, horizons, regimes, repeat=args.repeat, sim_steps=args.sim_steps,
+                              cell_limit=args.cell_limit)
+    
+    print(f"\n{'Benchmark':<36} {'Time (us)':>12}")
+    print("-" * 49)
+    for metric, value in results.items():
+        shown = "skipped" if value is None else f"{value / 1e3:.2f}"
+        print(f"{metric:<36} {shown:>12}")
+    
+    regressions = 0
+    if baseline is not None:
+        rows = compare_benchmarks(results, baseline['results'], args.threshold)
+        print(f"\nAgainst {args.compare} (code {baseline['code_version']}, threshold {args.threshold:.0%})")
+        print(f"{'Benchmark':<36} {'Base (us)':>12} {'Now (us)':>12} {'Change':>9}")
+        print("-" * 72)
+        for metric, previous, current, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{metric:<36} {previous / 1e3:>12.2f} {current / 1e3:>12.2f} {ratio - 1:>+9.1%}{flag}")
+            regressions += regressed
+    
+    if args.save:
+        if regressions and args.compare and os.path.abspath(args.save) == os.path.abspath(args.compare):
+            print(f"\nKeeping {args.save}: a run with regressions does not replace its own baseline")
+        else:
+            save_benchmark(args.save, results, config)
+            print(f"\nBaseline written to {args.save}")
+    
+    if regressions:
+        raise SystemExit(f"{regressions} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+
+
+def command_verify(args):
+    rows = verify_planners(args.reference)
+    print(f"\n{'Algorithm':<14} {'Decisions':<12} {'Differing':<11} {'Runs':<6} {'Differing':<9}")
+    print("-" * 56)
+    for algo_name, decisions, decisions_differing, runs, runs_differing in rows:
+        print(f"{algo_name:<14} {decisions:<12} {decisions_differing:<11} {runs:<6} {runs_differing:<9}")
+    
+    failed = [row[0] for row in rows if row[2] or row[4]]
+    if failed:
+        raise SystemExit(f"decisions differ from {args.reference} for {', '.join(failed)}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AI-based intelligent traffic light control system")
+    commands = parser.add_subparsers(dest="command")
+    
+    simulate = commands.add_parser("simulate", help="run one planner headless")
+    simulate.add_argument("--algorithm", default="A*")
+    simulate.add_argument("--steps", type=int, default=300)
+    simulate.add_argument("--horizon", type=int, default=10)
+    simulate.add_argument("--seed", type=int, default=None)
+    simulate.add_argument("--step-budget", type=float, default=None, help="seconds per step (anytime mode)")
+    simulate.add_argument("--trace", default=None, help="replay a recorded traffic trace")
+    simulate.add_argument("--log", default=None, help="write every step to a .csv, .jsonl or columnar file")
+    simulate.add_argument("--quiet", action="store_true")
+    simulate.add_argument("--warm-start", action="store_true", help="reuse the last plan between steps (B&B)")
+    simulate.add_argument("--policy-table", default=None, help="table for the Table planner (see compile)")
+    simulate.add_argument("--rollouts", type=int, default=MC_ROLLOUTS, help="MC: rollouts per action")
+    simulate.add_argument("--decision-budget", type=float, default=MC_TIME_BUDGET, help="MC: seconds per decision")
+    simulate.add_argument("--processes", type=int, default=1, help="MC: rollout worker processes")
+    simulate.set_defaults(handler=command_simulate)
+    
+    compare = commands.add_parser("compare", help="compare all planners headless")
+    compare.add_argument("--steps", type=int, default=300)
+    compare.add_argument("--horizon", type=int, default=10)
+    compare.add_argument("--seed", type=int, default=0)
+    compare.add_argument("--runs", type=int, default=0, help="seeded runs per planner (0 = legacy single run)")
+    compare.add_argument("--processes", type=int, default=None)
+    compare.add_argument("--trace", default=None, help="replay a recorded traffic trace")
+    compare.add_argument("--stats", action="store_true", help="print search statistics")
+    compare.add_argument("--stats-json", default=None)
+    compare.add_argument("--trace-memory", action="store_true")
+    compare.set_defaults(handler=command_compare)
+    
+    gui = commands.add_parser("gui", help="launch the GUI (default)")
+    gui.add_argument("--algorithm", default=None, help="skip the comparison and use this planner")
+    gui.add_argument("--steps", type=int, default=300)
+    gui.add_argument("--horizon", type=int, default=10)
+    gui.add_argument("--seed", type=int, default=0)
+    gui.add_argument("--no-cache", action="store_true")
+    gui.add_argument("--warm-start", action="store_true", help="reuse the last plan between steps (B&B)")
+    gui.add_argument("--step-budget", type=float, default=None, help="seconds per step (anytime mode)")
+    gui.set_defaults(handler=command_gui)
+    
+    record = commands.add_parser("record", help="record a traffic trace for simulate/compare --trace")
+    record.add_argument("output")
+    record.add_argument("--steps", type=int, default=300)
+    record.add_argument("--seed", type=int, default=None)
+    record.set_defaults(handler=command_record)
+    
+    compile_table = commands.add_parser("compile", help="compile a planner into a policy table")
+    compile_table.add_argument("output")
+    compile_table.add_argument("--algorithm", default="DP", help="a planner that decides on canonical states")
+    compile_table.add_argument("--horizon", type=int, default=10)
+    compile_table.add_argument("--max-queue", type=int, default=63)
+    compile_table.add_argument("--min-green", type=int, default=3)
+    compile_table.add_argument("--processes", type=int, default=None)
+    compile_table.set_defaults(handler=command_compile)
+    
+    network = commands.add_parser("network", help="simulate a grid of intersections (needs NumPy)")
+    network.add_argument("--rows", type=int, default=50)
+    network.add_argument("--cols", type=int, default=100)
+    network.add_argument("--delay", type=int, default=2, help="link travel time in steps")
+    network.add_argument("--algorithm", default="DP")
+    network.add_argument("--policy-table", default=None, help="use a compiled policy table")
+    network.add_argument("--steps", type=int, default=300)
+    network.add_argument("--horizon", type=int, default=10)
+    network.add_argument("--seed", type=int, default=0)
+    network.set_defaults(handler=command_network)
+    
+    batch = commands.add_parser("batch", help="decisions/sec of plan_batch as the batch grows")
+    batch.add_argument("--algorithm", default="A*")
+    batch.add_argument("--horizon", type=int, default=10)
+    batch.add_argument("--sizes", default="1,10,100,1000")
+    batch.add_argument("--ticks", type=int, default=20)
+    batch.add_argument("--seed", type=int, default=0)
+    batch.add_argument("--processes", type=int, default=1, help="worker processes for unique states")
+    batch.set_defaults(handler=command_batch)
+    
+    serve = commands.add_parser("serve", help="serve decisions to roadside units over a local socket")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", default=None, help="listen on a Unix socket path instead")
+    serve.add_argument("--algorithm", default="A*")
+    serve.add_argument("--horizon", type=int, default=10)
+    serve.add_argument("--processes", type=int, default=None)
+    serve.add_argument("--batch-window-ms", type=float, default=2.0)
+    serve.add_argument("--max-batch", type=int, default=256)
+    serve.add_argument("--deadline-ms", type=float, default=100.0, help="default per-request deadline")
+    serve.set_defaults(handler=command_serve)
+    
+    loadgen = commands.add_parser("loadgen", help="load-test a running serve command")
+    loadgen.add_argument("--host", default="127.0.0.1")
+    loadgen.add_argument("--port", type=int, default=8765)
+    loadgen.add_argument("--unix", default=None)
+    loadgen.add_argument("--clients", type=int, default=50)
+    loadgen.add_argument("--requests", type=int, default=200, help="requests per client")
+    loadgen.add_argument("--deadline-ms", type=float, default=100.0)
+    loadgen.add_argument("--seed", type=int, default=0)
+    loadgen.set_defaults(handler=command_loadgen)
+    
+    sweep = commands.add_parser("sweep", help="parameter sweep with a resumable SQLite result cache")
+    sweep.add_argument("--db", default="sweep.sqlite")
+    sweep.add_argument("--algorithms", default=None, help="comma-separated, default all")
+    sweep.add_argument("--horizons", default=None, help="e.g. 6,8,10")
+    sweep.add_argument("--min-green", default=None, help="e.g. 2,3,4")
+    sweep.add_argument("--arrivals", default=None, help="arrival ranges, e.g. 0-2,0-3")
+    sweep.add_argument("--departures", default=None, help="departure ranges, e.g. 1-3,1-4")
+    sweep.add_argument("--steps", type=int, default=300)
+    sweep.add_argument("--seed", type=int, default=0)
+    sweep.add_argument("--seeds", type=int, default=4, help="seeds per cell")
+    sweep.add_argument("--processes", type=int, default=None)
+    sweep.add_argument("--top", type=int, default=20, help="summary rows to print")
+    sweep.set_defaults(handler=command_sweep)
+    
+    dashboard = commands.add_parser("dashboard", help="run planners side by side in worker processes")
+    dashboard.add_argument("--algorithms", default=None, help="comma-separated, default A*,BFS,DFS,UCS,IDDFS")
+    dashboard.add_argument("--steps", type=int, default=300)
+    dashboard.add_argument("--horizon", type=int, default=10)
+    dashboard.add_argument("--seed", type=int, default=0)
+    dashboard.set_defaults(handler=command_dashboard)
+    
+    bench = commands.add_parser("bench", help="benchmark planners and the simulator")
+    bench.add_argument("--algorithms", default=None, help="comma-separated, default BFS,DFS,UCS,A*,IDDFS")
+    bench.add_argument("--horizons", default="4,8,12,16,20")
+    bench.add_argument("--regimes", default="empty,balanced,saturated")
+    bench.add_argument("--repeat", type=int, default=5)
+    bench.add_argument("--sim-steps", type=int, default=300)
+    bench.add_argument("--cell-limit", type=float, default=2.0, help="seconds per decision before skipping larger horizons")
+    bench.add_argument("--save", default=None, help="write the results as a JSON baseline")
+    bench.add_argument("--compare", default=None, help="flag regressions against a saved baseline")
+    bench.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    bench.set_defaults(handler=command_bench)
+    
+    verify = commands.add_parser("verify", help="check the planners against recorded reference decisions")
+    verify.add_argument("--reference", default=PLANNER_REFERENCE)
+    verify.set_defaults(handler=command_verify)
+    
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["gui"] + (argv or []))
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file